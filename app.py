@@ -5,9 +5,8 @@ import time
 from datetime import datetime
 
 # --- Local imports ---
-from scripts.fetch_fanduel import fetch_fanduel_props
-from scripts.fetch_games import fetch_games_today
-from scripts.apply_predictions import run_model_predictions
+from scripts.data_cache import cached_predictions, invalidate, shared_refresher
+from scripts.odds_aggregator import SOURCE_PRIORITY, aggregate_from_store, props_ready
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="Hot Shot Props — NBA Prop Lab (AI)",
@@ -15,50 +14,108 @@ st.set_page_config(page_title="Hot Shot Props — NBA Prop Lab (AI)",
 
 # --- HEADER ---
 st.markdown("<h1 style='color:#FF6F00;'>🏀 Hot Shot Props — NBA Prop Lab (AI)</h1>", unsafe_allow_html=True)
-st.markdown("<p>Live FanDuel props + BallDontLie games + AI model preview.</p>", unsafe_allow_html=True)
+st.markdown("<p>Live props (FanDuel, with Odds API / PrizePicks fallback) + BallDontLie games + AI model preview.</p>", unsafe_allow_html=True)
 
 # --- REFRESH DATA ---
 col1, col2 = st.columns([1, 1])
+refresher = shared_refresher()
 if col1.button("🔁 Refresh Data"):
-    st.cache_data.clear()
+    # Ask the background worker for new odds/games; logs and models stay warm
+    refresher.refresh_now(*SOURCE_PRIORITY, "games")
+    invalidate("predictions")
     st.rerun()
-last_update = datetime.now().strftime("%b %d, %Y %I:%M:%S %p")
-col2.write(f"**Last updated:** {last_update}")
-
-# --- FETCH LIVE DATA ---
-with st.status("⏳ Fetching live data...", expanded=False):
-    try:
-        props_df = fetch_fanduel_props()
-    except Exception as e:
-        st.error(f"FanDuel fetch error: {e}")
-        props_df = pd.DataFrame()
-
-    try:
-        games_df = fetch_games_today()
-    except Exception as e:
-        st.error(f"Game fetch error: {e}")
-        games_df = pd.DataFrame()
-
-# --- DISPLAY DATA ---
-st.subheader("🎯 FanDuel Player Props")
-if props_df.empty:
-    st.warning("No FanDuel props found.")
-else:
-    st.dataframe(props_df.head(30), use_container_width=True)
-
-st.subheader("🏀 Today's Games (BallDontLie)")
-if games_df.empty:
-    st.warning("No games available.")
-else:
-    st.dataframe(games_df, use_container_width=True)
-
-# --- RUN AI PREDICTIONS ---
+
+# --- LAYOUT (placeholders filled as each source's snapshot arrives) ---
+SNAPSHOT_WAIT_SECONDS = 30
+SECTIONS = {
+    "props": ("🎯 Player Props", "Props", "No props found from any book."),
+    "games": ("🏀 Today's Games (BallDontLie)", "Game", "No games available."),
+}
+
+update_slot = col2.empty()
+slots = {}
+for source, (title, _, _) in SECTIONS.items():
+    st.subheader(title)
+    slots[source] = st.empty()
 st.subheader("🤖 AI Model Predictions (Preview)")
+preds_slot = st.empty()
+
+
+def age_label(fetched_at):
+    if fetched_at is None:
+        return "never"
+    secs = int((datetime.now() - fetched_at).total_seconds())
+    return f"{secs}s ago" if secs < 120 else f"{secs // 60} min ago"
+
+
+def render_section(source: str, data, fetched_at=None, error=None, caption=None):
+    _, label, empty_msg = SECTIONS[source]
+    with slots[source].container():
+        if error:
+            st.error(f"{label} fetch error: {error}")
+        if caption:
+            st.caption(caption)
+        if data is None or data.empty:
+            st.warning(empty_msg)
+        elif source == "props":
+            st.dataframe(data.head(30), use_container_width=True)
+        else:
+            st.dataframe(data, use_container_width=True)
+
+
+def load_section(source: str):
+    """(data, fetched_at) for a section once its inputs are in the store, else None."""
+    store = refresher.store
+    if source == "props":
+        if not props_ready(store):
+            return None
+        # Canonical multi-book frame; falls back past FanDuel only if it failed or is stale
+        props, used = aggregate_from_store(store)
+        snap = store.get(used) if used else store.get(SOURCE_PRIORITY[0])
+        caption = f"Source: {props['source'].iat[0]}" if used else None
+        render_section(source, props, error=snap.error if snap else None, caption=caption)
+        return props, snap.fetched_at if snap else None
+    snap = store.get(source)
+    if snap is None:
+        return None
+    render_section(source, snap.data, error=snap.error)
+    return snap.data, snap.fetched_at
+
+
+# --- LIVE DATA (latest snapshots published by the background refresher) ---
+# Sources are fetched concurrently in the background; each section renders
+# as soon as its inputs exist (only the first session after start-up
+# ever waits here).
+loaded = {}
+pending = list(SECTIONS)
+deadline = time.monotonic() + SNAPSHOT_WAIT_SECONDS
+while pending:
+    seen = refresher.store.version
+    for source in list(pending):
+        result = load_section(source)
+        if result is not None:
+            loaded[source] = result
+            pending.remove(source)
+        else:
+            slots[source].info(f"⏳ Fetching {SECTIONS[source][1]} data...")
+    remaining = deadline - time.monotonic()
+    if not pending or remaining <= 0:
+        break
+    refresher.store.wait_for_update(seen, timeout=remaining)
+for source in pending:
+    render_section(source, None)
+
+props_df, props_at = loaded.get("props", (pd.DataFrame(), None))
+_, games_at = loaded.get("games", (pd.DataFrame(), None))
+last_update = props_at.strftime("%b %d, %Y %I:%M:%S %p") if props_at else "—"
+update_slot.write(f"**Last updated:** {last_update} · odds {age_label(props_at)} · games {age_label(games_at)}")
+
+# --- RUN AI PREDICTIONS (trained models over stored game logs) ---
 try:
-    preds_df = run_model_predictions(props_df, games_df)
+    preds_df = cached_predictions(props_df)
     if preds_df.empty:
-        st.info("No model predictions yet.")
+        preds_slot.info("No model predictions yet.")
     else:
-        st.dataframe(preds_df.head(20), use_container_width=True)
+        preds_slot.dataframe(preds_df.head(20), use_container_width=True)
 except Exception as e:
-    st.error(f"Prediction error: {e}")
+    preds_slot.error(f"Prediction error: {e}")
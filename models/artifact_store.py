@@ -0,0 +1,161 @@
+# -------------------------------------------------
+# models/artifact_store.py
+# -------------------------------------------------
+# Hot Shot Props — Versioned Model Artifacts
+# Every training run is staged in a scratch directory, then moved
+# to runs/<content hash>/ together with manifest.json (features and
+# dtypes, training window, metrics, library versions). A CURRENT
+# file names the live run and is swapped with os.replace, so deploys
+# and rollbacks are a single atomic rename.
+# -------------------------------------------------
+
+import os
+import json
+import uuid
+import shutil
+import hashlib
+import platform
+from datetime import datetime
+from importlib import metadata
+
+STORE_DIR = os.getenv(
+    "MODEL_STORE_DIR", os.path.join(os.path.dirname(__file__), "..", "data", "model_store")
+)
+RUNS_DIR = os.path.join(STORE_DIR, "runs")
+CURRENT_FILE = os.path.join(STORE_DIR, "CURRENT")
+MANIFEST_NAME = "manifest.json"
+RUN_ID_LENGTH = 12
+
+LIBRARIES = ["numpy", "pandas", "scipy", "scikit-learn", "xgboost", "joblib"]
+
+
+def _sha1(path: str):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def library_versions():
+    versions = {"python": platform.python_version()}
+    for lib in LIBRARIES:
+        try:
+            versions[lib] = metadata.version(lib)
+        except metadata.PackageNotFoundError:
+            versions[lib] = None
+    return versions
+
+
+# -------------------------------------------------
+# Reading
+# -------------------------------------------------
+def run_dir(run_id: str):
+    return os.path.join(RUNS_DIR, run_id)
+
+
+def current_run():
+    """ID of the live run, or None before the first published run."""
+    try:
+        with open(CURRENT_FILE, "r") as f:
+            run_id = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return run_id if run_id and os.path.isdir(run_dir(run_id)) else None
+
+
+def load_manifest(run_id: str = None):
+    """Manifest of `run_id` (default: the current run), or None."""
+    run_id = run_id or current_run()
+    if not run_id:
+        return None
+    try:
+        with open(os.path.join(run_dir(run_id), MANIFEST_NAME), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def list_runs():
+    """Manifests of every stored run, newest first."""
+    if not os.path.isdir(RUNS_DIR):
+        return []
+    runs = [load_manifest(r) for r in os.listdir(RUNS_DIR) if not r.startswith(".")]
+    return sorted((m for m in runs if m), key=lambda m: m.get("created_at", ""), reverse=True)
+
+
+# -------------------------------------------------
+# Publishing
+# -------------------------------------------------
+def set_current(run_id: str):
+    """Point CURRENT at an existing run (deploy or rollback) atomically."""
+    if not os.path.isdir(run_dir(run_id)):
+        raise ValueError(f"Unknown model run: {run_id}")
+    tmp = f"{CURRENT_FILE}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w") as f:
+        f.write(run_id)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, CURRENT_FILE)
+    print(f"🔄 Current model run -> {run_id}")
+    return run_id
+
+
+def new_staging_dir():
+    """Scratch directory on the same filesystem as the runs (so commit is a rename)."""
+    path = os.path.join(RUNS_DIR, f".staging-{uuid.uuid4().hex}")
+    os.makedirs(path)
+    return path
+
+
+def _carry_forward(staging: str, manifest: dict, base_id: str):
+    """Copy stats this run didn't train from `base_id`, so every run is complete."""
+    base = load_manifest(base_id)
+    if not base:
+        return
+    for stat, entry in base.get("models", {}).items():
+        if stat in manifest["models"]:
+            continue
+        for name in entry.get("files", {}):
+            shutil.copy2(os.path.join(run_dir(base_id), name), os.path.join(staging, name))
+        manifest["models"][stat] = {**entry, "inherited_from": entry.get("inherited_from", base_id)}
+
+
+def commit_run(staging: str, manifest: dict, activate: bool = True, carry_forward: bool = True):
+    """
+    Finish a staged run: hash the artifacts into a run ID, write the
+    manifest, move the directory to runs/<run_id> and (by default) make
+    it current. `manifest["models"][stat]["files"]` lists each stat's
+    artifact file names inside `staging`. Returns the run ID.
+    """
+    base_id = current_run()
+    if carry_forward and base_id:
+        _carry_forward(staging, manifest, base_id)
+
+    digest = hashlib.sha1()
+    for stat in sorted(manifest["models"]):
+        files = manifest["models"][stat].setdefault("files", {})
+        for name in sorted(files):
+            files[name] = _sha1(os.path.join(staging, name))
+            digest.update(f"{name}:{files[name]}".encode())
+    digest.update(json.dumps(manifest.get("features"), sort_keys=True).encode())
+    run_id = digest.hexdigest()[:RUN_ID_LENGTH]
+
+    manifest = {"run_id": run_id, "created_at": datetime.utcnow().isoformat(),
+                "parent": base_id, "libraries": library_versions(), **manifest}
+    with open(os.path.join(staging, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    target = run_dir(run_id)
+    if os.path.isdir(target):
+        # Identical artifacts were published before; reuse that run
+        shutil.rmtree(staging, ignore_errors=True)
+    else:
+        os.replace(staging, target)
+    if activate:
+        set_current(run_id)
+    return run_id
+
+
+def discard_staging(staging: str):
+    shutil.rmtree(staging, ignore_errors=True)
@@ -0,0 +1,177 @@
+# -------------------------------------------------
+# models/features.py
+# -------------------------------------------------
+# Hot Shot Props — Model Feature Definitions
+# Feature columns shared by training and inference. Training
+# rows only see games *before* the one being predicted (shifted
+# windows); the inference path looks at just each player's
+# trailing window of games and never needs the target column.
+# -------------------------------------------------
+
+import hashlib
+import threading
+
+import numpy as np
+import pandas as pd
+
+ROLLING_STATS = ["PTS", "REB", "AST", "FG3M", "MIN", "PRA"]
+ROLLING_WINDOWS = (5, 10)
+TARGET_COLS = ["PTS", "REB", "AST", "PRA", "FG3M"]
+FEATURE_COLS = [f"{stat}_L{w}" for w in ROLLING_WINDOWS for stat in ROLLING_STATS]
+
+# Sportsbook / UI prop labels -> model target (FanDuel, The Odds API, PrizePicks)
+PROP_TYPE_TO_STAT = {
+    "points": "PTS", "pts": "PTS",
+    "rebounds": "REB", "reb": "REB",
+    "assists": "AST", "ast": "AST",
+    "3pm": "FG3M", "threes": "FG3M", "3-pt made": "FG3M", "made threes": "FG3M", "fg3m": "FG3M",
+    "pra": "PRA", "pts+reb+ast": "PRA", "pts+rebs+asts": "PRA", "points + rebounds + assists": "PRA",
+}
+# Display label for each target, matching the app's prop-type picker
+STAT_LABELS = {"PTS": "Points", "REB": "Rebounds", "AST": "Assists", "FG3M": "3PM", "PRA": "PRA"}
+
+# Content hash of a player's tail window -> feature row. Keyed on the rows
+# themselves, so frames without a player ID (or with shared game IDs)
+# can't collide, and a new or corrected game changes the key.
+_ROW_CACHE = {}
+_ROW_CACHE_LOCK = threading.Lock()
+_ROW_CACHE_MAX = 5000
+
+
+def stat_code(prop_type):
+    """Map a sportsbook/UI prop label ("Points", "3PM", "PRA", ...) to its model target."""
+    label = str(prop_type).strip()
+    if label.upper() in TARGET_COLS:
+        return label.upper()
+    return PROP_TYPE_TO_STAT.get(label.lower())
+
+
+def _with_player_key(logs: pd.DataFrame, group_col: str):
+    """Single-player frames without an ID column are treated as one group."""
+    return logs if group_col in logs.columns else logs.assign(**{group_col: 0})
+
+
+def _tail_keys(tail: pd.DataFrame, group_col: str):
+    """{player: digest of that player's tail rows, in game order}."""
+    cols = [c for c in ROLLING_STATS if c in tail.columns]
+    row_hashes = pd.util.hash_pandas_object(tail[cols], index=False).to_numpy()
+    return {
+        pid: hashlib.blake2b(row_hashes[idx].tobytes(), digest_size=16).hexdigest()
+        for pid, idx in tail.groupby(group_col, sort=False).indices.items()
+    }
+
+
+# -------------------------------------------------
+# Vectorized rolling windows (all players at once)
+# -------------------------------------------------
+def add_rolling_features(logs: pd.DataFrame, windows=ROLLING_WINDOWS, shift: int = 0,
+                         group_col: str = "PLAYER_ID"):
+    """
+    Add `{stat}_L{w}` rolling means for every player in one long frame.
+    Uses grouped cumulative sums, so cost is O(rows) regardless of the
+    number of players. `shift=1` makes each row see only prior games.
+    """
+    logs = _with_player_key(logs, group_col)
+    sort_cols = [group_col, "GAME_DATE"] if "GAME_DATE" in logs.columns else [group_col]
+    logs = logs.sort_values(sort_cols, kind="stable").reset_index(drop=True)
+    logs["PRA"] = logs["PTS"] + logs["REB"] + logs["AST"]
+
+    values = logs[ROLLING_STATS].to_numpy(dtype="float64")
+    pid = logs[group_col].to_numpy()
+    n = len(logs)
+    if n == 0:
+        for col in ROLLING_STATS:
+            for w in windows:
+                logs[f"{col}_L{w}"] = pd.Series(dtype="float64")
+        return logs
+
+    # Position of each row inside its player's block
+    starts = np.r_[True, pid[1:] != pid[:-1]]
+    first = np.maximum.accumulate(np.where(starts, np.arange(n), 0))
+    pos = np.arange(n) - first
+
+    valid = ~np.isnan(values)
+    csum = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(np.where(valid, values, 0.0), axis=0)])
+    ccnt = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(valid, axis=0)])
+
+    end = np.arange(n) + 1 - shift  # exclusive end of each window in csum coordinates
+    for w in windows:
+        full = (pos - shift) >= (w - 1)
+        lo = np.clip(end - w, 0, None)
+        hi = np.clip(end, 0, None)
+        sums = csum[hi] - csum[lo]
+        cnts = ccnt[hi] - ccnt[lo]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(full[:, None] & (cnts > 0), sums / cnts, np.nan)
+        for j, col in enumerate(ROLLING_STATS):
+            logs[f"{col}_L{w}"] = means[:, j]
+    return logs
+
+
+# -------------------------------------------------
+# Training rows (no leakage)
+# -------------------------------------------------
+def training_features(logs: pd.DataFrame, group_col: str = "PLAYER_ID"):
+    """
+    One row per player-game with FEATURE_COLS built from that player's
+    *previous* games only, plus every target column. Rows without a full
+    history window are dropped. Sorted by GAME_DATE (or input order).
+    """
+    feats = add_rolling_features(logs, shift=1, group_col=group_col)
+    feats = feats.dropna(subset=FEATURE_COLS + TARGET_COLS)
+    if "GAME_DATE" in feats.columns:
+        feats = feats.sort_values(["GAME_DATE", group_col], kind="stable")
+    return feats.reset_index(drop=True)
+
+
+# -------------------------------------------------
+# Inference rows (latest game only)
+# -------------------------------------------------
+def inference_features(logs: pd.DataFrame, group_col: str = "PLAYER_ID"):
+    """
+    FEATURE_COLS for each player's *next* game, one row per player
+    (indexed by `group_col`). Only the last max(ROLLING_WINDOWS) games per
+    player are touched and the target column is never required; rows for
+    players whose trailing window is unchanged come from an in-process cache.
+    """
+    if logs.empty:
+        return pd.DataFrame(columns=FEATURE_COLS)
+    window = max(ROLLING_WINDOWS)
+    df = _with_player_key(logs, group_col)
+    if "GAME_DATE" in df.columns:
+        df = df.sort_values([group_col, "GAME_DATE"], kind="stable")
+
+    tail = df.groupby(group_col, sort=False).tail(window)
+    counts = df.groupby(group_col, sort=False).size()
+
+    cache_keys = _tail_keys(tail, group_col)
+    with _ROW_CACHE_LOCK:
+        cached = {pid: _ROW_CACHE[k] for pid, k in cache_keys.items() if k in _ROW_CACHE}
+
+    todo = [pid for pid in counts.index if pid not in cached]
+    rows = []
+    if todo:
+        part = tail[tail[group_col].isin(todo)]
+        part = part.assign(PRA=part["PTS"] + part["REB"] + part["AST"])
+        # Position from the end of each player's tail: 0 = latest game
+        from_end = part.groupby(group_col, sort=False).cumcount(ascending=False)
+        pieces = []
+        for w in ROLLING_WINDOWS:
+            pg = part[from_end < w].groupby(group_col, sort=False)
+            means = pg[ROLLING_STATS].mean()
+            means.loc[pg.size() < w] = np.nan
+            means.columns = [f"{c}_L{w}" for c in ROLLING_STATS]
+            pieces.append(means)
+        feats = pd.concat(pieces, axis=1)[FEATURE_COLS]
+        with _ROW_CACHE_LOCK:
+            if len(_ROW_CACHE) > _ROW_CACHE_MAX:
+                _ROW_CACHE.clear()
+            for pid, row in feats.iterrows():
+                _ROW_CACHE[cache_keys[pid]] = row
+        rows.append(feats)
+    if cached:
+        rows.append(pd.DataFrame.from_dict(cached, orient="index")[FEATURE_COLS])
+
+    out = pd.concat(rows)
+    out.index.name = group_col
+    return out.reindex(counts.index)
@@ -0,0 +1,164 @@
+# -------------------------------------------------
+# models/model_registry.py
+# -------------------------------------------------
+# Hot Shot Props — In-Process Model Registry
+# Loads each stat model once and keeps it in memory keyed by
+# (stat, version). Artifacts are re-checked at most every few
+# seconds and hot-reloaded when their mtime + content hash change.
+# Compiled `.npz` trees (models/tree_engine.py) are preferred over
+# joblib pickles, so serving never has to import xgboost. "latest"
+# follows the artifact store's CURRENT run (models/artifact_store.py);
+# a run's feature order is checked against FEATURE_COLS before use.
+# -------------------------------------------------
+
+import os
+import time
+import hashlib
+import threading
+
+import joblib
+
+from models import artifact_store
+from models.features import FEATURE_COLS
+from models.tree_engine import load_compiled
+
+MODEL_DIR = os.path.dirname(__file__)
+STAT_COLS = ["PTS", "REB", "AST", "PRA", "FG3M"]
+RELOAD_CHECK_SECONDS = float(os.getenv("MODEL_RELOAD_CHECK_SECONDS", "5"))
+PREFER_COMPILED = os.getenv("MODEL_ENGINE", "numpy").lower() == "numpy"
+
+
+def _file_hash(path: str):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ModelRegistry:
+    """Thread-safe cache of deserialized models, keyed by (stat, version)."""
+
+    def __init__(self, model_dir: str = MODEL_DIR):
+        self.model_dir = model_dir
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _run_for(self, version: str = None):
+        """Store run backing `version`: the CURRENT run for latest, else a run ID."""
+        if version in (None, "latest"):
+            return artifact_store.current_run()
+        return version if os.path.isdir(artifact_store.run_dir(version)) else None
+
+    def artifact_path(self, stat: str, version: str = None, ext: str = "joblib"):
+        run_id = self._run_for(version)
+        if run_id:
+            return os.path.join(artifact_store.run_dir(run_id), f"{stat}_model.{ext}")
+        # Unversioned artifacts from before the store existed
+        name = f"{stat}_model.{ext}" if version in (None, "latest") else f"{stat}_model_{version}.{ext}"
+        return os.path.join(self.model_dir, name)
+
+    def _expected_features(self, path: str, model):
+        """Feature order the artifact was trained with, if recorded."""
+        run_dir = os.path.dirname(os.path.abspath(path))
+        if os.path.dirname(run_dir) == os.path.abspath(artifact_store.RUNS_DIR):
+            manifest = artifact_store.load_manifest(os.path.basename(run_dir)) or {}
+            return [f["name"] for f in manifest.get("features", [])] or None
+        meta = getattr(model, "meta", None) or {}
+        return meta.get("features")
+
+    @staticmethod
+    def _feature_count(model):
+        """Input width of a bare pickle (no manifest/meta), if the model knows it."""
+        n = getattr(model, "n_features_in_", None)
+        if n is None and hasattr(model, "get_booster"):
+            try:
+                n = model.get_booster().num_features()
+            except Exception:
+                n = None
+        return None if n is None else int(n)
+
+    def _resolve(self, stat: str, version: str = None):
+        """Compiled trees when present (and preferred), else the joblib pickle."""
+        if PREFER_COMPILED:
+            compiled = self.artifact_path(stat, version, ext="npz")
+            if os.path.exists(compiled):
+                return compiled
+        return self.artifact_path(stat, version)
+
+    def _load(self, key, path):
+        mtime = os.path.getmtime(path)
+        digest = _file_hash(path)
+        entry = self._entries.get(key)
+        if entry and entry["path"] == path and entry["sha1"] == digest:
+            # Touched but identical: keep the loaded model
+            entry.update(mtime=mtime, checked_at=time.monotonic())
+            return entry["model"]
+        model = load_compiled(path) if path.endswith(".npz") else joblib.load(path)
+        features = self._expected_features(path, model)
+        n_features = self._feature_count(model) if features is None else len(features)
+        if ((features is not None and features != FEATURE_COLS)
+                or (n_features is not None and n_features != len(FEATURE_COLS))):
+            # Cached as missing so callers retrain instead of scoring garbage
+            print(f"⚠️ {key[0]} artifact {path} was trained on a different feature set; ignoring it")
+            model = None
+        else:
+            print(f"📂 Loaded {key[0]} model ({key[1]}) from {os.path.relpath(path, os.path.dirname(os.path.abspath(self.model_dir)))}")
+        self._entries[key] = {"model": model, "path": path, "mtime": mtime,
+                              "sha1": digest, "checked_at": time.monotonic()}
+        return model
+
+    def get(self, stat: str, version: str = None):
+        """Return the in-memory model for (stat, version), or None if no artifact exists."""
+        key = (stat, version or "latest")
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.monotonic()
+            if entry and now - entry["checked_at"] < RELOAD_CHECK_SECONDS:
+                return entry["model"]
+            path = self._resolve(stat, version)
+            if not os.path.exists(path):
+                return entry["model"] if entry else None
+            if entry and entry["path"] == path and os.path.getmtime(path) == entry["mtime"]:
+                entry["checked_at"] = now
+                return entry["model"]
+            return self._load(key, path)
+
+    def register(self, stat: str, model, version: str = None):
+        """Install a freshly trained model without a disk round-trip."""
+        key = (stat, version or "latest")
+        path = self._resolve(stat, version)
+        with self._lock:
+            exists = os.path.exists(path)
+            self._entries[key] = {
+                "model": model,
+                "path": path,
+                "mtime": os.path.getmtime(path) if exists else None,
+                "sha1": _file_hash(path) if exists else None,
+                "checked_at": time.monotonic(),
+            }
+
+    def warmup(self, stats=None, version: str = None):
+        """Load every available stat model up front; returns the stats loaded."""
+        return [stat for stat in (stats or STAT_COLS) if self.get(stat, version) is not None]
+
+    def loaded(self):
+        with self._lock:
+            return sorted(self._entries.keys())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_REGISTRY = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_registry():
+    """Process-wide registry shared by the app, pages and scripts."""
+    global _REGISTRY
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            _REGISTRY = ModelRegistry()
+        return _REGISTRY
@@ -9,92 +9,366 @@ import os
 import joblib
 import numpy as np
 import pandas as pd
-from datetime import datetime
-from xgboost import XGBRegressor
-from sklearn.model_selection import train_test_split
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from sklearn.metrics import mean_absolute_error
 
+from models.artifact_store import commit_run, discard_staging, new_staging_dir
+from models.distribution import DEFAULT_PARAMS, fit_distribution, over_probabilities
+from models.features import FEATURE_COLS, TARGET_COLS, inference_features, stat_code, training_features
+from models.model_registry import STAT_COLS, get_registry
+from models.training_data import build_training_matrix, load_training_matrix, matrix_path
+from models.tree_engine import check_parity, compile_model
+
 MODEL_DIR = os.path.join(os.path.dirname(__file__))
 os.makedirs(MODEL_DIR, exist_ok=True)
 
+WALK_FORWARD_SPLITS = 4
+
+# Fast training: histogram splits + early stopping on the latest slice of
+# each fold's training window (never the block it is scored on);
+# n_estimators is only an upper bound until the final all-rows refit
+TREE_METHOD = os.getenv("XGB_TREE_METHOD", "hist")
+MAX_BIN = int(os.getenv("XGB_MAX_BIN", "256"))
+MAX_ESTIMATORS = 1000
+EARLY_STOPPING_FRACTION = 0.1
+EARLY_STOPPING_ROUNDS = 30
+
+# Rows from the end of the training matrix used to verify compiled trees
+PARITY_CHECK_ROWS = 2000
+
 
 # -------------------------------------------------
 # Utility: prepare features for regression
 # -------------------------------------------------
+def build_training_set(df: pd.DataFrame):
+    """
+    Build the shared training matrix once for every target: FEATURE_COLS
+    from each player's previous games only, all TARGET_COLS, and a time
+    key used for walk-forward splits. Returns (X, Y, times).
+    """
+    if df.empty:
+        raise ValueError("No game logs to train on")
+    feats = training_features(df)
+    if feats.empty:
+        raise ValueError("Not enough games per player to build shifted features")
+    times = feats["GAME_DATE"].to_numpy() if "GAME_DATE" in feats.columns else np.arange(len(feats))
+    X = feats[FEATURE_COLS].astype(np.float32)
+    Y = feats[TARGET_COLS]
+    return X, Y, times
+
+
 def prepare_training_data(df: pd.DataFrame, target_col: str):
     """
     Given a DataFrame of player game logs, create features for model training.
     target_col = 'PTS', 'REB', 'AST', 'PRA', or 'FG3M'
     """
-    df = df.copy()
-    if df.empty or target_col not in df.columns:
-        raise ValueError(f"Missing target column: {target_col}")
-
-    # Basic rolling features
-    df["PTS_L5"] = df["PTS"].rolling(5).mean()
-    df["REB_L5"] = df["REB"].rolling(5).mean()
-    df["AST_L5"] = df["AST"].rolling(5).mean()
-    df["FG3M_L5"] = df["FG3M"].rolling(5).mean()
-    df["MIN_L5"] = df["MIN"].rolling(5).mean()
-
-    df["PRA"] = df["PTS"] + df["REB"] + df["AST"]
+    if target_col not in TARGET_COLS:
+        raise ValueError(f"Unknown target column: {target_col}")
+    X, Y, _ = build_training_set(df)
+    return X, Y[target_col]
 
-    # Drop missing rows from rolling
-    df = df.dropna()
 
-    # Target and features
-    y = df[target_col]
-    X = df[["PTS_L5", "REB_L5", "AST_L5", "FG3M_L5", "MIN_L5", "PRA"]]
-
-    return X, y
+def walk_forward_splits(times, n_splits: int = WALK_FORWARD_SPLITS, min_train_frac: float = 0.5):
+    """
+    Expanding-window, time-ordered folds over the distinct values of
+    `times`: each fold trains on everything before a cut date and
+    validates on the next block of dates. Games on the same date never
+    straddle train and validation. Returns [(train_idx, val_idx), ...].
+    """
+    times = np.asarray(times)
+    uniq = np.unique(times)
+    start = max(1, int(len(uniq) * min_train_frac))
+    n_splits = max(1, min(n_splits, len(uniq) - start))
+    bounds = np.linspace(start, len(uniq), n_splits + 1).astype(int)
+    folds = []
+    for i in range(n_splits):
+        lo, hi = uniq[bounds[i]], uniq[bounds[i + 1] - 1]
+        train_idx = np.flatnonzero(times < lo)
+        val_idx = np.flatnonzero((times >= lo) & (times <= hi))
+        if len(train_idx) and len(val_idx):
+            folds.append((train_idx, val_idx))
+    if not folds:
+        raise ValueError("Not enough distinct dates for a time-based split")
+    return folds
 
 
 # -------------------------------------------------
 # Model Training
 # -------------------------------------------------
-def train_prop_model(df: pd.DataFrame, target_col: str, save=True):
-    """
-    Trains and saves a model for the given stat type.
-    """
-    X, y = prepare_training_data(df, target_col)
-
-    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
+def _new_model(n_jobs: int = None, n_estimators: int = None):
+    # Imported here so serving from compiled trees never loads xgboost
+    from xgboost import XGBRegressor
 
-    model = XGBRegressor(
-        n_estimators=300,
+    return XGBRegressor(
+        n_estimators=n_estimators or MAX_ESTIMATORS,
         learning_rate=0.08,
         max_depth=5,
         subsample=0.8,
         colsample_bytree=0.9,
-        random_state=42
+        tree_method=TREE_METHOD,
+        max_bin=MAX_BIN,
+        # A fixed tree count (final refit) has nothing to early-stop on
+        early_stopping_rounds=None if n_estimators else EARLY_STOPPING_ROUNDS,
+        random_state=42,
+        n_jobs=n_jobs
     )
 
-    model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
-    preds = model.predict(X_val)
-    mae = mean_absolute_error(y_val, preds)
+
+def best_iteration(model):
+    """Best boosting round recorded by early stopping, or None."""
+    try:
+        return int(model.best_iteration)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def model_predict(model, X):
+    """Predict using only the trees up to the recorded best iteration."""
+    best = best_iteration(model)
+    if best is None:
+        return model.predict(X)
+    return model.predict(X, iteration_range=(0, best + 1))
+
+
+def _take(a, idx):
+    """Rows `idx` of `a`; a zero-copy slice when the indices are contiguous."""
+    if len(idx) and idx[-1] - idx[0] + 1 == len(idx):
+        return a[idx[0]:idx[-1] + 1]
+    return a[idx]
+
+
+def _fit_walk_forward(X, y, folds, n_jobs: int = None):
+    """
+    Fit one model per fold, early-stopping on the most recent
+    EARLY_STOPPING_FRACTION of that fold's training window so the
+    validation block stays untouched for its MAE. The returned model is
+    refit on every row with the last fold's best tree count. Returns
+    (model, per-fold MAEs, (out-of-fold targets, out-of-fold predictions)).
+    """
+    if isinstance(X, str):
+        X = np.load(X, mmap_mode="r")
+    y = np.asarray(y, dtype=np.float32)
+    trees, maes, oof_y, oof_mu = MAX_ESTIMATORS, [], [], []
+    for train_idx, val_idx in folds:
+        # Rows are time-sorted, so the tail of the window is its latest games
+        n_stop = max(1, int(len(train_idx) * EARLY_STOPPING_FRACTION))
+        fit_idx, stop_idx = train_idx[:-n_stop], train_idx[-n_stop:]
+        if not len(fit_idx):
+            fit_idx = stop_idx
+        model = _new_model(n_jobs)
+        model.fit(_take(X, fit_idx), y[fit_idx], eval_set=[(_take(X, stop_idx), y[stop_idx])], verbose=False)
+        y_val = y[val_idx]
+        preds = model_predict(model, _take(X, val_idx))
+        maes.append(mean_absolute_error(y_val, preds))
+        oof_y.append(y_val)
+        oof_mu.append(preds)
+        best = best_iteration(model)
+        trees = MAX_ESTIMATORS if best is None else best + 1
+
+    model = _new_model(n_jobs, n_estimators=trees)
+    model.fit(X, y, verbose=False)
+    return model, maes, (np.concatenate(oof_y), np.concatenate(oof_mu))
+
+
+def tree_count(model):
+    """Trees used at prediction time (best iteration + 1, else all)."""
+    best = best_iteration(model)
+    return best + 1 if best is not None else int(model.get_params()["n_estimators"])
+
+
+def _attach_distribution(stat: str, model, oof):
+    """Fit the stat's dispersion on out-of-fold residuals and store it on the model."""
+    model.dist_params_ = fit_distribution(stat, *oof)
+    return model.dist_params_
+
+
+def dist_params(stat: str, model=None):
+    """Distribution params saved with `model`, else the stat's defaults."""
+    params = getattr(model, "dist_params_", None) if model is not None else None
+    return params or DEFAULT_PARAMS.get(stat)
+
+
+def export_compiled(target_col: str, model, X_check=None, out_dir: str = MODEL_DIR):
+    """
+    Write `{stat}_model.npz`: the model's trees up to the best iteration
+    as NumPy arrays. When `X_check` is given the compiled output must
+    match model_predict on it, otherwise nothing is written.
+    """
+    best = best_iteration(model)
+    compiled = compile_model(model, n_trees=None if best is None else best + 1, meta={
+        "stat": target_col,
+        "features": FEATURE_COLS,
+        "best_iteration": best,
+        "distribution": dist_params(target_col, model),
+    })
+    if X_check is not None:
+        X_check = np.asarray(X_check, dtype=np.float32)
+        try:
+            check_parity(compiled, X_check, model_predict(model, X_check))
+        except ValueError as e:
+            print(f"⚠️ {target_col}: not exporting compiled trees — {e}")
+            return None
+    path = os.path.join(out_dir, f"{target_col}_model.npz")
+    return compiled.save(path)
+
+
+def _training_window(times, seasons=None):
+    times = np.asarray(times)
+    if np.issubdtype(times.dtype, np.datetime64):
+        start, end = str(times.min().astype("datetime64[D]")), str(times.max().astype("datetime64[D]"))
+    else:
+        start, end = int(times.min()), int(times.max())
+    return {"start": start, "end": end, "seasons": list(seasons) if seasons else None}
+
+
+def _publish_run(fitted: dict, times, n_rows: int, X_check=None, seasons=None):
+    """
+    Write {stat: (model, fold MAEs)} as one versioned run in the artifact
+    store (joblib + compiled trees + manifest), make it current and
+    install the models in the registry. Returns the run ID.
+    """
+    staging = new_staging_dir()
+    try:
+        models = {}
+        for stat, (model, maes) in fitted.items():
+            name = f"{stat}_model.joblib"
+            joblib.dump(model, os.path.join(staging, name))
+            files = {name: None}
+            if export_compiled(stat, model, X_check, out_dir=staging):
+                files[f"{stat}_model.npz"] = None
+            models[stat] = {"files": files, "mae": float(np.mean(maes)), "fold_maes": [float(m) for m in maes],
+                            "n_trees": tree_count(model), "distribution": dist_params(stat, model)}
+        manifest = {
+            "features": [{"name": col, "dtype": "float32"} for col in FEATURE_COLS],
+            "training_window": {**_training_window(times, seasons), "rows": int(n_rows)},
+            "params": {"tree_method": TREE_METHOD, "max_bin": MAX_BIN, "max_estimators": MAX_ESTIMATORS,
+                       "early_stopping_rounds": EARLY_STOPPING_ROUNDS,
+                       "early_stopping_fraction": EARLY_STOPPING_FRACTION,
+                       "walk_forward_splits": WALK_FORWARD_SPLITS},
+            "models": models,
+        }
+        run_id = commit_run(staging, manifest)
+    except Exception:
+        discard_staging(staging)
+        raise
+
+    registry = get_registry()
+    for stat, (model, maes) in fitted.items():
+        registry.register(stat, model)
+        print(f"✅ {stat} model trained & saved (run {run_id}) — walk-forward MAE: {np.mean(maes):.2f}, "
+              f"trees: {tree_count(model)}")
+    return run_id
+
+
+def train_prop_model(df: pd.DataFrame, target_col: str, save=True):
+    """
+    Trains and saves a model for the given stat type.
+    MAE is the mean over walk-forward folds (out-of-time, no leakage).
+    """
+    if target_col not in TARGET_COLS:
+        raise ValueError(f"Unknown target column: {target_col}")
+    X, Y, times = build_training_set(df)
+    model, maes, oof = _fit_walk_forward(X, Y[target_col], walk_forward_splits(times))
+    _attach_distribution(target_col, model, oof)
+    mae = float(np.mean(maes))
 
     if save:
-        path = os.path.join(MODEL_DIR, f"{target_col}_model.joblib")
-        joblib.dump(model, path)
-        print(f"✅ {target_col} model trained & saved — MAE: {mae:.2f}")
+        _publish_run({target_col: (model, maes)}, times, len(X), X_check=X.to_numpy()[-PARITY_CHECK_ROWS:])
 
     return model, mae
 
 
+def _train_stat(stat: str, X, y: np.ndarray, folds, n_jobs: int):
+    """
+    Process-pool task: walk-forward fit for one target. `X` may be a path
+    to a .npy matrix, which the worker memory-maps instead of unpickling.
+    """
+    model, maes, oof = _fit_walk_forward(X, y, folds, n_jobs=n_jobs)
+    _attach_distribution(stat, model, oof)
+    return stat, model, maes
+
+
+def _plan_workers(n_tasks: int, n_workers: int = None):
+    """
+    Split the machine between concurrent models and XGBoost threads.
+    Returns (workers, [threads per task]): tasks run in submission order
+    in waves of `workers`, and each wave's threads add up to every core,
+    the remainder going to its first tasks (a lone last task gets them all).
+    """
+    cpus = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers or n_tasks, n_tasks, cpus))
+    threads = []
+    for start in range(0, n_tasks, n_workers):
+        wave = min(n_workers, n_tasks - start)
+        base, extra = divmod(cpus, wave)
+        threads += [base + (i < extra) for i in range(wave)]
+    return n_workers, threads
+
+
+def train_all(df: pd.DataFrame, stats=None, n_workers: int = None, save=True):
+    """
+    Build the feature matrix once, then train every stat in parallel on
+    a process pool (threads per model fill every core; see _plan_workers).
+    Publishes all artifacts as one versioned run (models/artifact_store.py).
+    Returns {stat: (model, walk-forward MAE)}.
+    """
+    X, Y, times = build_training_set(df)
+    return _train_matrix(X.to_numpy(dtype=np.float32), Y, times, stats, n_workers, save)
+
+
+def train_all_from_store(seasons, stats=None, n_workers: int = None, save=True, rebuild=True):
+    """
+    Train on every stored player-game of `seasons`: builds (or reuses,
+    with rebuild=False) the memory-mapped float32 matrix from the log
+    store, and workers map X from disk rather than receiving a copy.
+    """
+    if rebuild:
+        build_training_matrix(seasons)
+    X, Y, times, meta = load_training_matrix()
+    Y = pd.DataFrame(np.asarray(Y), columns=meta["targets"])
+    return _train_matrix(X, Y, times, stats, n_workers, save, x_source=matrix_path(), seasons=meta["seasons"])
+
+
+def _train_matrix(X, Y: pd.DataFrame, times, stats=None, n_workers: int = None, save=True,
+                  x_source=None, seasons=None):
+    """Shared body of train_all / train_all_from_store: folds, pool, published run."""
+    stats = list(stats or TARGET_COLS)
+    folds = walk_forward_splits(times)
+    n_workers, n_jobs = _plan_workers(len(stats), n_workers)
+
+    fitted = []
+    if n_workers == 1:
+        for stat, threads in zip(stats, n_jobs):
+            fitted.append(_train_stat(stat, X, Y[stat].to_numpy(np.float32), folds, threads))
+    else:
+        print(f"🧵 Training {len(stats)} models on {n_workers} processes "
+              f"(threads per model: {', '.join(map(str, n_jobs))})")
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = [pool.submit(_train_stat, stat, x_source or X, Y[stat].to_numpy(np.float32), folds, threads)
+                       for stat, threads in zip(stats, n_jobs)]
+            for fut in as_completed(futures):
+                fitted.append(fut.result())
+
+    fitted = {stat: (model, maes) for stat, model, maes in sorted(fitted, key=lambda r: stats.index(r[0]))}
+    if save:
+        _publish_run(fitted, times, len(X), X_check=np.asarray(X[-PARITY_CHECK_ROWS:], dtype=np.float32),
+                     seasons=seasons)
+    return {stat: (model, float(np.mean(maes))) for stat, (model, maes) in fitted.items()}
+
+
 # -------------------------------------------------
 # Load existing or train fresh
 # -------------------------------------------------
 def load_or_train(df: pd.DataFrame, target_col: str):
     """
-    Loads model from disk if it exists; otherwise trains it.
+    Returns the registry's in-memory model (loaded from disk once);
+    trains and registers one if no artifact exists yet.
     """
-    path = os.path.join(MODEL_DIR, f"{target_col}_model.joblib")
-    if os.path.exists(path):
-        print(f"📂 Loading saved model for {target_col}")
-        model = joblib.load(path)
+    model = get_registry().get(target_col)
+    if model is not None:
         return model
-    else:
-        return train_prop_model(df, target_col)
+    model, _ = train_prop_model(df, target_col)
+    return model
 
 
 # -------------------------------------------------
@@ -102,23 +376,107 @@ def load_or_train(df: pd.DataFrame, target_col: str):
 # -------------------------------------------------
 def predict_props(df: pd.DataFrame):
     """
-    Given a fresh player dataset (latest rolling stats),
-    predict PTS/REB/AST/PRA/3PM.
+    Given a fresh player dataset (game logs, oldest first),
+    predict PTS/REB/AST/PRA/3PM for the next game.
     Returns DataFrame with projected stats.
     """
-    results = []
+    registry = get_registry()
+    missing = [stat for stat in STAT_COLS if registry.get(stat) is None]
+    if missing:
+        try:
+            train_all(df, stats=missing)
+        except Exception as e:
+            print(f"⚠️ Training failed for {missing}: {e}")
+    stats = [stat for stat in STAT_COLS if registry.get(stat) is not None]
+
+    feats = inference_features(df).rename_axis("player").reset_index()
+    preds = predict_slate(feats, stats=stats)
+    return preds[["prop_type", "projection"]].reset_index(drop=True)
+
+
+# -------------------------------------------------
+# Batched slate inference
+# -------------------------------------------------
+def predict_slate(features: pd.DataFrame, key_cols=("player",), stats=None, decimals: int = 1):
+    """
+    Score a whole slate at once: `features` holds one row per player (or
+    per player/prop; duplicates on `key_cols` are scored once) with
+    FEATURE_COLS. Runs a single `predict` per stat model over all rows and
+    returns a tidy frame [*key_cols, prop_type, projection].
+    `decimals=None` leaves projections unrounded.
+    """
+    keys = list(key_cols)
+    out_cols = keys + ["prop_type", "projection"]
+    if features.empty:
+        return pd.DataFrame(columns=out_cols)
+
+    rows = features.drop_duplicates(subset=keys)
+    X = rows[FEATURE_COLS].to_numpy(dtype=np.float32)
+    key_values = {k: rows[k].to_numpy() for k in keys}
 
-    stat_cols = ["PTS", "REB", "AST", "PRA", "FG3M"]
-    for stat in stat_cols:
+    frames = []
+    for stat in stats or STAT_COLS:
+        model = get_registry().get(stat)
+        if model is None:
+            print(f"⚠️ No trained model for {stat}; skipping")
+            continue
         try:
-            model = load_or_train(df, stat)
-            X, _ = prepare_training_data(df, stat)
-            pred = model.predict(X.tail(1))[0]
-            results.append({"prop_type": stat, "projection": round(pred, 1)})
+            preds = model_predict(model, X).astype(np.float64)
         except Exception as e:
-            print(f"⚠️ Prediction failed for {stat}: {e}")
+            # One bad artifact shouldn't take the whole slate down
+            print(f"⚠️ {stat} prediction failed: {e}")
+            continue
+        if decimals is not None:
+            preds = np.round(preds, decimals)
+        frames.append(pd.DataFrame({**key_values, "prop_type": stat, "projection": preds}))
+
+    if not frames:
+        return pd.DataFrame(columns=out_cols)
+    return pd.concat(frames, ignore_index=True)[out_cols]
+
+
+# -------------------------------------------------
+# Distributional mode: P(over line)
+# -------------------------------------------------
+def predict_over_probs(features: pd.DataFrame, props: pd.DataFrame, key_cols=("player",)):
+    """
+    Calibrated P(stat > line) for every prop in one pass. `props` holds
+    [*key_cols, prop_type, line]; `features` is the slate's FEATURE_COLS
+    frame as for predict_slate. Each stat model predicts the mean once,
+    then the fitted NegBin (REB/AST/FG3M) or normal (PTS/PRA) head turns
+    (mean, line) into probabilities vectorized across the whole slate.
+    Returns `props` plus projection, p_over and p_under.
+    """
+    keys = list(key_cols)
+    out = props.copy()
+    out["line"] = pd.to_numeric(out["line"], errors="coerce")
+    out["stat"] = out["prop_type"].map(stat_code)
+    stats = [s for s in STAT_COLS if s in set(out["stat"].dropna())]
+    if out.empty or not stats:
+        return out.assign(projection=np.nan, p_over=np.nan, p_under=np.nan).drop(columns="stat")
+
+    mu = predict_slate(features, key_cols=keys, stats=stats, decimals=None)
+    mu = mu.rename(columns={"prop_type": "stat"})
+    out = out.merge(mu, on=keys + ["stat"], how="left")
+
+    registry = get_registry()
+    params = {stat: dist_params(stat, registry.get(stat)) for stat in stats}
+    ok = (out["projection"].notna() & out["line"].notna()).to_numpy()
+    mu_ok = out["projection"].to_numpy(dtype=np.float64)[ok]
+    line_ok = out["line"].to_numpy(dtype=np.float64)[ok]
+    stat_ok = out["stat"].to_numpy()[ok]
+
+    p_over = np.full(len(out), np.nan)
+    p_under = np.full(len(out), np.nan)
+    p_over[ok] = over_probabilities(mu_ok, line_ok, stat_ok, params)
+    # Whole-number lines can push: under is P(X <= line - 1), not 1 - P(over)
+    under_line = np.where(np.floor(line_ok) == line_ok, line_ok - 1.0, line_ok)
+    p_under[ok] = 1.0 - over_probabilities(mu_ok, under_line, stat_ok, params)
 
-    return pd.DataFrame(results)
+    out["projection"] = np.round(out["projection"], 1)
+    out["p_over"] = np.round(p_over, 4)
+    out["p_under"] = np.round(p_under, 4)
+    return out.drop(columns="stat")
 
 
 if __name__ == "__main__":
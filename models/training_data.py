@@ -0,0 +1,115 @@
+# -------------------------------------------------
+# models/training_data.py
+# -------------------------------------------------
+# Hot Shot Props — Training Matrix Builder
+# Streams every player's logs season by season from the local
+# game-log store, computes shifted rolling features in one grouped
+# pass per season and writes a compact, time-sorted float32 matrix
+# to disk (.npy, memory-mapped on load) for XGBoost to consume
+# without an extra pandas copy.
+# -------------------------------------------------
+
+import os
+import json
+from datetime import datetime
+
+import numpy as np
+
+from models.features import FEATURE_COLS, TARGET_COLS, training_features
+from scripts.log_store import load_logs
+
+TRAINING_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "training")
+os.makedirs(TRAINING_DATA_DIR, exist_ok=True)
+
+LOG_COLUMNS = ["PLAYER_ID", "GAME_ID", "GAME_DATE", "PTS", "REB", "AST", "FG3M", "MIN"]
+
+
+def _paths(out_dir: str):
+    return {
+        "X": os.path.join(out_dir, "X.npy"),
+        "Y": os.path.join(out_dir, "Y.npy"),
+        "times": os.path.join(out_dir, "times.npy"),
+        "meta": os.path.join(out_dir, "meta.json"),
+    }
+
+
+def build_training_matrix(seasons, out_dir: str = TRAINING_DATA_DIR):
+    """
+    Build X (rows x FEATURE_COLS), Y (rows x TARGET_COLS) and times
+    (datetime64[D]) for every player-game in `seasons`. Only float32
+    blocks are held between seasons; the final arrays are written
+    straight into .npy memmaps. Returns the metadata dict.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = _paths(out_dir)
+    blocks = []
+    for season in seasons:
+        logs = load_logs(season, columns=LOG_COLUMNS)
+        if logs.empty:
+            print(f"⚠️ No stored logs for {season}; skipping")
+            continue
+        feats = training_features(logs)
+        blocks.append((
+            feats[FEATURE_COLS].to_numpy(dtype=np.float32),
+            feats[TARGET_COLS].to_numpy(dtype=np.float32),
+            feats["GAME_DATE"].to_numpy(dtype="datetime64[D]"),
+        ))
+        print(f"📦 {season}: {len(feats)} training rows")
+        del logs, feats
+    if not blocks:
+        raise ValueError(f"No training rows for seasons {list(seasons)}")
+
+    # Seasons are processed in the given order; sort once more so
+    # walk-forward splits can slice contiguous time blocks
+    times = np.concatenate([b[2] for b in blocks])
+    order = np.argsort(times, kind="stable")
+    n_rows = len(times)
+
+    # Scatter each season block to its sorted rows (inverse permutation)
+    # so X/Y never exist as a second full in-RAM copy
+    dest = np.empty_like(order)
+    dest[order] = np.arange(n_rows)
+    X = np.lib.format.open_memmap(paths["X"], mode="w+", dtype=np.float32, shape=(n_rows, len(FEATURE_COLS)))
+    Y = np.lib.format.open_memmap(paths["Y"], mode="w+", dtype=np.float32, shape=(n_rows, len(TARGET_COLS)))
+    start = 0
+    while blocks:
+        bx, by, _ = blocks.pop(0)
+        rows = dest[start:start + len(bx)]
+        X[rows] = bx
+        Y[rows] = by
+        start += len(bx)
+        del bx, by
+    X.flush()
+    Y.flush()
+    np.save(paths["times"], times[order])
+    del X, Y
+
+    meta = {
+        "built_at": datetime.utcnow().isoformat(),
+        "seasons": list(seasons),
+        "rows": int(n_rows),
+        "features": FEATURE_COLS,
+        "targets": TARGET_COLS,
+    }
+    with open(paths["meta"], "w") as f:
+        json.dump(meta, f, indent=2)
+    print(f"✅ Training matrix: {n_rows} rows x {len(FEATURE_COLS)} features -> {out_dir}")
+    return meta
+
+
+def load_training_matrix(out_dir: str = TRAINING_DATA_DIR):
+    """Memory-map a built matrix: returns (X, Y, times, meta)."""
+    paths = _paths(out_dir)
+    with open(paths["meta"], "r") as f:
+        meta = json.load(f)
+    if meta["features"] != FEATURE_COLS or meta["targets"] != TARGET_COLS:
+        raise ValueError("Training matrix was built with a different feature/target layout; rebuild it")
+    X = np.load(paths["X"], mmap_mode="r")
+    Y = np.load(paths["Y"], mmap_mode="r")
+    times = np.load(paths["times"])
+    return X, Y, times, meta
+
+
+def matrix_path(out_dir: str = TRAINING_DATA_DIR):
+    """Path of X.npy, for process-pool workers to memory-map themselves."""
+    return _paths(out_dir)["X"]
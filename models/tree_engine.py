@@ -0,0 +1,150 @@
+# -------------------------------------------------
+# models/tree_engine.py
+# -------------------------------------------------
+# Hot Shot Props — Compiled Tree Inference
+# Flattens a trained XGBRegressor into plain NumPy arrays (split
+# feature, threshold, children, default direction, leaf value) saved
+# as .npz, and scores them with a vectorized evaluator that walks
+# every (row, tree) pair one depth level at a time. Loading and
+# predicting needs only NumPy — no xgboost, no pickles.
+# -------------------------------------------------
+
+import json
+
+import numpy as np
+
+PARITY_TOLERANCE = 1e-4
+
+
+class CompiledTrees:
+    """
+    All trees of one model packed end to end: node i of tree t lives at
+    roots[t] + i. Leaves have left == -1 and carry their value in `value`.
+    """
+
+    def __init__(self, feature, threshold, left, right, default_left, value, roots,
+                 base_score: float, max_depth: int, meta: dict = None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.value = value
+        self.roots = roots
+        self.base_score = float(base_score)
+        self.max_depth = int(max_depth)
+        self.meta = meta or {}
+        # Same attribute the XGBoost models carry (see models/distribution.py)
+        self.dist_params_ = self.meta.get("distribution")
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def predict(self, X):
+        """Score every row against every tree in max_depth vectorized steps."""
+        X = np.asarray(X, dtype=np.float32)
+        n = len(X)
+        if n == 0 or self.n_trees == 0:
+            return np.full(n, self.base_score, dtype=np.float32)
+        rows = np.arange(n)[:, None]
+        node = np.broadcast_to(self.roots, (n, self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            is_split = self.left[node] >= 0
+            if not is_split.any():
+                break
+            x = X[rows, self.feature[node]]
+            go_left = np.where(np.isnan(x), self.default_left[node], x < self.threshold[node])
+            nxt = np.where(go_left, self.left[node], self.right[node])
+            node = np.where(is_split, nxt, node)
+        # XGBoost accumulates leaf values in float32 on top of the base score
+        return (self.value[node].sum(axis=1, dtype=np.float32) + np.float32(self.base_score)).astype(np.float32)
+
+    def save(self, path: str):
+        np.savez(
+            path,
+            feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+            default_left=self.default_left, value=self.value, roots=self.roots,
+            base_score=np.float64(self.base_score), max_depth=np.int64(self.max_depth),
+            meta=np.array(json.dumps(self.meta)),
+        )
+        return path
+
+
+def load_compiled(path: str):
+    """Load a .npz written by CompiledTrees.save (no pickle involved)."""
+    with np.load(path, allow_pickle=False) as z:
+        return CompiledTrees(
+            z["feature"], z["threshold"], z["left"], z["right"], z["default_left"], z["value"],
+            z["roots"], float(z["base_score"]), int(z["max_depth"]), json.loads(str(z["meta"])),
+        )
+
+
+# -------------------------------------------------
+# Export from a trained XGBRegressor
+# -------------------------------------------------
+def _parse_base_score(raw):
+    # xgboost >= 2 stores a vector as "[2.1E1]"
+    return float(str(raw).strip("[]").split(",")[0])
+
+
+def _depth(left, right, root=0):
+    depth, level = 0, [root]
+    while True:
+        level = [c for i in level if left[i] >= 0 for c in (left[i], right[i])]
+        if not level:
+            return depth
+        depth += 1
+
+
+def compile_model(model, n_trees: int = None, meta: dict = None):
+    """
+    Flatten `model`'s booster (only the first `n_trees` rounds, e.g. up to
+    the early-stopping best iteration) into a CompiledTrees.
+    """
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    if n_trees is not None:
+        booster = booster[0:n_trees]
+    raw = json.loads(booster.save_raw("json"))
+    learner = raw["learner"]
+    trees = learner["gradient_booster"]["model"]["trees"]
+
+    feature, threshold, left, right, default_left, value, roots = [], [], [], [], [], [], []
+    offset, max_depth = 0, 0
+    for tree in trees:
+        lc = np.asarray(tree["left_children"], dtype=np.int32)
+        rc = np.asarray(tree["right_children"], dtype=np.int32)
+        cond = np.asarray(tree["split_conditions"], dtype=np.float32)
+        leaf = lc < 0
+        roots.append(offset)
+        feature.append(np.where(leaf, 0, np.asarray(tree["split_indices"], dtype=np.int32)))
+        threshold.append(cond)
+        left.append(np.where(leaf, -1, lc + offset))
+        right.append(np.where(leaf, -1, rc + offset))
+        default_left.append(np.asarray(tree["default_left"], dtype=bool))
+        value.append(np.where(leaf, cond, 0.0).astype(np.float32))
+        max_depth = max(max_depth, _depth(lc, rc))
+        offset += len(lc)
+
+    def cat(parts, dtype):
+        return np.concatenate(parts).astype(dtype) if parts else np.zeros(0, dtype=dtype)
+
+    return CompiledTrees(
+        cat(feature, np.int32), cat(threshold, np.float32), cat(left, np.int32), cat(right, np.int32),
+        cat(default_left, bool), cat(value, np.float32), np.asarray(roots, dtype=np.int64),
+        _parse_base_score(learner["learner_model_param"]["base_score"]), max_depth, meta,
+    )
+
+
+def check_parity(compiled: CompiledTrees, X, expected, tolerance: float = PARITY_TOLERANCE):
+    """
+    Max |compiled - expected| over X, where `expected` is the source
+    model's prediction for X; raises ValueError above `tolerance`.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    if not len(X):
+        return 0.0
+    diff = float(np.max(np.abs(compiled.predict(X) - np.asarray(expected, dtype=np.float32))))
+    if diff > tolerance:
+        raise ValueError(f"Compiled trees disagree with model.predict (max abs diff {diff:.2e})")
+    return diff
@@ -9,7 +9,7 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from scripts.fetch_player_stats import get_player_stats_summary
+from scripts.data_cache import cached_player_summary
 
 # ---------- PAGE CONFIG ----------
 st.set_page_config(page_title="Player Prop Analyzer | Hot Shot Props", page_icon="📊")
@@ -45,7 +45,7 @@ prop_line = st.sidebar.number_input("Prop Line", min_value=0.0, step=0.5, value=
 # ---------- FETCH & DISPLAY ----------
 if player_name:
     with st.spinner(f"Fetching {player_name}'s game logs..."):
-        df, summary = get_player_stats_summary(player_name, prop_type, prop_line)
+        df, summary = cached_player_summary(player_name, prop_type, prop_line)
 
     if df.empty:
         st.warning("No data available for that player.")
@@ -60,9 +60,7 @@ if player_name:
     )
 
     # ---------- LINE CHART ----------
-    stat_col = "PRA" if prop_type == "PRA" else prop_type[0:3].upper()
-    if stat_col not in df.columns:
-        stat_col = "PTS"
+    stat_col = summary["stat"]
 
     chart = go.Figure()
     chart.add_trace(go.Scatter(
@@ -1,15 +1,50 @@
-import pandas as pd
+# -------------------------------------------------
+# scripts/apply_predictions.py
+# -------------------------------------------------
+# Hot Shot Props — Slate Predictions
+# Scores the canonical props frame with the trained stat models:
+# stored game logs -> inference_features -> predict_slate ->
+# fitted P(over) heads, joined back on (player_id, prop_type).
+# The edge is P(over) minus the market's no-vig over probability.
+# -------------------------------------------------
+
+import os
+
 import numpy as np
+import pandas as pd
+
+from models.features import inference_features
+from models.prop_model import predict_over_probs
+from scripts.log_store import load_logs
+
+PREDICTION_SEASON = os.getenv("PREDICTION_SEASON", "2024-25")
+
+OUTPUT_COLS = ["player", "prop_type", "line", "odds_over", "odds_under", "no_vig_over", "book",
+               "projection", "p_over", "edge", "edge_flag", "game"]
+
+
+def run_model_predictions(props_df: pd.DataFrame, season: str = PREDICTION_SEASON):
+    """
+    P(over) and edge for every prop whose player has stored logs and
+    whose stat has a trained model; best edges first. Props without a
+    model, logs or line are left out.
+    """
+    if props_df.empty:
+        return pd.DataFrame(columns=OUTPUT_COLS)
 
-def run_model_predictions(props_df: pd.DataFrame, games_df: pd.DataFrame):
-    """Mock AI predictions combining props and games."""
-    if props_df.empty or games_df.empty:
-        return pd.DataFrame()
+    props = props_df[props_df["player_id"].notna()]
+    props = props.assign(player_id=props["player_id"].astype("int64"))
+    logs = load_logs(season, player_ids=props["player_id"].unique().tolist())
+    if logs.empty:
+        print("⚠️ No stored game logs for today's props; run the log refresh first")
+        return pd.DataFrame(columns=OUTPUT_COLS)
 
-    # Example simple prediction model placeholder
-    props_df = props_df.copy()
-    props_df["predicted_value"] = np.random.uniform(-10, 10, len(props_df)).round(2)
-    props_df["edge_value"] = (props_df["predicted_value"] - props_df["line"]).round(2)
-    props_df["edge_flag"] = np.where(props_df["edge_value"] > 0, "🔥 Over", "❄️ Under")
+    feats = inference_features(logs).rename_axis("player_id").reset_index()
+    scored = predict_over_probs(feats, props, key_cols=("player_id",))
+    scored = scored[scored["p_over"].notna()].copy()
 
-    return props_df[["player", "prop_type", "line", "odds", "predicted_value", "edge_value", "edge_flag", "game"]]
+    scored["edge"] = (scored["p_over"] - scored["no_vig_over"]).round(4)
+    # One-sided sources (PrizePicks) have no market price to beat
+    scored["edge_flag"] = np.select([scored["edge"] > 0, scored["edge"] < 0], ["🔥 Over", "❄️ Under"], "")
+    scored = scored.sort_values("edge", ascending=False, na_position="last", kind="stable")
+    return scored[OUTPUT_COLS].reset_index(drop=True)
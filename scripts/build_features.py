@@ -6,41 +6,49 @@
 # -------------------------------------------------
 
 import os
+import time
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from nba_api.stats.static import players, teams
-from nba_api.stats.endpoints import playergamelog, leaguedashteamstats
+
+from models.features import ROLLING_STATS, ROLLING_WINDOWS, add_rolling_features
+from scripts.player_index import resolve_player_id, resolve_players
+from scripts.fetch_player_stats import bulk_fetch_players
+from scripts.team_index import to_abbreviations
+from scripts.team_context import get_team_defense
 
 CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "features_cache")
 os.makedirs(CACHE_DIR, exist_ok=True)
 
 
+# -------------------------------------------------
+# Latest rolling row per player
+# -------------------------------------------------
+def latest_feature_rows(logs: pd.DataFrame):
+    """Rolling features as of each player's most recent game, one row per player."""
+    feats = add_rolling_features(logs)
+    last = feats.groupby("PLAYER_ID", sort=False).tail(1).copy()
+    parts = last["MATCHUP"].astype(str).str.split(" ")
+    # Canonicalize so relocated/renamed franchises share one key
+    last["team"] = to_abbreviations(parts.str[0])
+    last["opponent"] = to_abbreviations(parts.str[-1])
+    return last.reset_index(drop=True)
+
+
 # -------------------------------------------------
 # Fetch player logs + rolling stats
 # -------------------------------------------------
 def get_recent_logs(player_name: str, season: str = "2024-25"):
     """Return last 20 game logs for a player with rolling averages."""
-    pid = None
-    for p in players.get_players():
-        if player_name.lower() in p["full_name"].lower():
-            pid = p["id"]
-            break
+    pid = resolve_player_id(player_name)
     if not pid:
         return pd.DataFrame()
 
     try:
-        logs = playergamelog.PlayerGameLog(player_id=pid, season=season).get_data_frames()[0]
-        logs["GAME_DATE"] = pd.to_datetime(logs["GAME_DATE"])
-        logs = logs.sort_values("GAME_DATE")
-        # Rolling features
-        for col in ["PTS", "REB", "AST", "FG3M", "MIN"]:
-            logs[f"{col}_L5"] = logs[col].rolling(5).mean()
-            logs[f"{col}_L10"] = logs[col].rolling(10).mean()
-        logs["PRA"] = logs["PTS"] + logs["REB"] + logs["AST"]
-        logs["PRA_L5"] = logs["PRA"].rolling(5).mean()
-        logs["PRA_L10"] = logs["PRA"].rolling(10).mean()
-        return logs.tail(20)
+        logs = bulk_fetch_players([player_name], season)
+        if logs.empty:
+            return pd.DataFrame()
+        return add_rolling_features(logs).tail(20)
     except Exception as e:
         print(f"⚠️ Failed to get logs for {player_name}: {e}")
         return pd.DataFrame()
@@ -49,19 +57,14 @@ def get_recent_logs(player_name: str, season: str = "2024-25"):
 # -------------------------------------------------
 # Opponent team context
 # -------------------------------------------------
-def get_team_defense_rank(season="2024-25"):
+def get_team_defense_rank(season="2024-25", as_of=None):
     """
-    Fetch team defensive stats and compute opponent ranks
-    (points allowed, rebounds allowed, assists allowed per game)
+    Opponent defensive ranks (points, rebounds, assists allowed per game),
+    indexed by TEAM_ABBREVIATION. Served from the TTL-bound team context
+    cache; `as_of` gives the ranks that held before that date.
     """
     try:
-        team_stats = leaguedashteamstats.LeagueDashTeamStats(season=season).get_data_frames()[0]
-        team_stats = team_stats[["TEAM_ID", "TEAM_NAME", "GP", "PTS", "REB", "AST"]]
-        team_stats.rename(columns={"PTS": "PTS_ALLOWED", "REB": "REB_ALLOWED", "AST": "AST_ALLOWED"}, inplace=True)
-        # Lower allowed => tougher defense
-        for col in ["PTS_ALLOWED", "REB_ALLOWED", "AST_ALLOWED"]:
-            team_stats[f"{col}_RANK"] = team_stats[col].rank(ascending=True)
-        return team_stats
+        return get_team_defense(season, as_of=as_of)
     except Exception as e:
         print(f"⚠️ Failed to get team defense ranks: {e}")
         return pd.DataFrame()
@@ -70,39 +73,50 @@ def get_team_defense_rank(season="2024-25"):
 # -------------------------------------------------
 # Build features for all players
 # -------------------------------------------------
+FEATURE_OUTPUT_COLS = (
+    ["player", "team", "opponent"]
+    + [f"{col}_L{w}" for w in ROLLING_WINDOWS for col in ROLLING_STATS]
+    + ["OPP_PTS_RANK", "OPP_REB_RANK", "OPP_AST_RANK"]
+)
+
+
+def build_feature_frame(logs: pd.DataFrame, team_def: pd.DataFrame):
+    """
+    Vectorized feature pass over a long frame of many players' logs:
+    one rolling computation, one opponent-defense merge.
+    """
+    last = latest_feature_rows(logs)
+    if team_def is not None and not team_def.empty:
+        opp = team_def[["PTS_ALLOWED_RANK", "REB_ALLOWED_RANK", "AST_ALLOWED_RANK"]].rename(columns={
+            "PTS_ALLOWED_RANK": "OPP_PTS_RANK",
+            "REB_ALLOWED_RANK": "OPP_REB_RANK",
+            "AST_ALLOWED_RANK": "OPP_AST_RANK",
+        })
+        last = last.join(opp, on="opponent")
+    else:
+        last["OPP_PTS_RANK"] = last["OPP_REB_RANK"] = last["OPP_AST_RANK"] = np.nan
+    return last
+
+
 def build_feature_set(player_list, season="2024-25"):
     """Combine player rolling stats + opponent defensive context."""
-    all_rows = []
     team_def = get_team_defense_rank(season)
+    resolved = resolve_players(player_list)
+    for name, pid in resolved.items():
+        if pid is None:
+            print(f"⚠️ Player not found: {name}")
+    names_by_id = {pid: name for name, pid in resolved.items() if pid is not None}
+
+    logs = bulk_fetch_players(list(names_by_id.values()), season)
+    if logs.empty:
+        return pd.DataFrame(columns=FEATURE_OUTPUT_COLS)
+
+    t0 = time.perf_counter()
+    df = build_feature_frame(logs, team_def)
+    df["player"] = df["PLAYER_ID"].map(names_by_id)
+    df = df[FEATURE_OUTPUT_COLS]
+    print(f"⚡ Features computed in {time.perf_counter() - t0:.3f}s")
 
-    for name in player_list:
-        logs = get_recent_logs(name, season)
-        if logs.empty:
-            continue
-        last_game = logs.iloc[-1]
-        team = last_game["TEAM_ABBREVIATION"]
-        opp = last_game["MATCHUP"].split(" ")[-1].replace("@", "").replace("vs.", "")
-        opp_row = team_def[team_def["TEAM_NAME"].str.contains(opp, case=False, na=False)]
-        row = {
-            "player": name,
-            "team": team,
-            "opponent": opp,
-            "PTS_L5": last_game.get("PTS_L5", np.nan),
-            "REB_L5": last_game.get("REB_L5", np.nan),
-            "AST_L5": last_game.get("AST_L5", np.nan),
-            "FG3M_L5": last_game.get("FG3M_L5", np.nan),
-            "MIN_L5": last_game.get("MIN_L5", np.nan),
-            "PRA_L5": last_game.get("PRA_L5", np.nan),
-        }
-        if not opp_row.empty:
-            row["OPP_PTS_RANK"] = opp_row["PTS_ALLOWED_RANK"].values[0]
-            row["OPP_REB_RANK"] = opp_row["REB_ALLOWED_RANK"].values[0]
-            row["OPP_AST_RANK"] = opp_row["AST_ALLOWED_RANK"].values[0]
-        else:
-            row["OPP_PTS_RANK"] = row["OPP_REB_RANK"] = row["OPP_AST_RANK"] = np.nan
-        all_rows.append(row)
-
-    df = pd.DataFrame(all_rows)
     save_path = os.path.join(CACHE_DIR, f"features_{datetime.now().strftime('%Y%m%d')}.csv")
     df.to_csv(save_path, index=False)
     print(f"✅ Built feature set for {len(df)} players -> {save_path}")
@@ -0,0 +1,105 @@
+# -------------------------------------------------
+# scripts/data_cache.py
+# -------------------------------------------------
+# Hot Shot Props — Streamlit Data Cache
+# Live odds and games come from the shared background refresher's
+# snapshots; what is left per session (game-log summaries and model
+# outputs) goes through st.cache_data wrappers with their own TTL, so
+# reruns read from memory. Wrappers are grouped by source ("logs",
+# "predictions", "models") and each group can be invalidated on its
+# own — Refresh drops predictions without throwing away 12h of game
+# logs or the loaded models.
+# -------------------------------------------------
+
+import os
+
+import pandas as pd
+import streamlit as st
+
+from models.features import stat_code
+from scripts.fetch_player_stats import CACHE_TTL_SECONDS, get_player_stats_summary
+from scripts.apply_predictions import run_model_predictions
+from scripts.refresher import BackgroundRefresher, default_sources
+
+ODDS_TTL_SECONDS = int(os.getenv("ODDS_TTL_SECONDS", "60"))
+LOGS_TTL_SECONDS = int(os.getenv("LOGS_TTL_SECONDS", str(CACHE_TTL_SECONDS)))
+HIT_RATE_WINDOWS = (5, 10, 20)
+
+# What the Refresh button clears; logs and models survive it
+LIVE_SOURCES = ("predictions",)
+
+
+# -------------------------------------------------
+# Game logs (~12 h)
+# -------------------------------------------------
+def _prop_summary(df: pd.DataFrame, player_name: str, prop_type: str, line):
+    """Season average and L5/L10/L20 hit rates (% of games over `line`) for one prop."""
+    stat = stat_code(prop_type) or "PTS"
+    values = df.sort_values("GAME_DATE", ascending=False)[stat] if stat in df else pd.Series(dtype="float64")
+    hit_rates = {}
+    for n in HIT_RATE_WINDOWS:
+        recent = values.head(n).dropna()
+        hit_rates[f"L{n}"] = None if line is None or recent.empty else round(100 * (recent > line).mean())
+    return {
+        "player": player_name.strip(),
+        "prop_type": prop_type or stat,
+        "stat": stat,
+        "line": line,
+        "games": len(df),
+        "avg": round(values.mean(), 1) if values.notna().any() else None,
+        "hit_rates": hit_rates,
+    }
+
+
+@st.cache_data(ttl=LOGS_TTL_SECONDS, show_spinner=False)
+def cached_player_summary(player_name: str, prop_type: str = None, line: float = None,
+                          season: str = "2024-25"):
+    """(logs, prop summary) for the analyzer page; PRA is added to the logs."""
+    df, _ = get_player_stats_summary(player_name, prop_type, season)
+    if df.empty:
+        return df, {}
+    df = df.assign(PRA=df["PTS"] + df["REB"] + df["AST"])
+    return df, _prop_summary(df, player_name, prop_type, line)
+
+
+# -------------------------------------------------
+# Model outputs
+# -------------------------------------------------
+@st.cache_data(ttl=ODDS_TTL_SECONDS, show_spinner=False)
+def cached_predictions(props_df: pd.DataFrame):
+    """Keyed on the props frame's contents, so new odds mean new predictions."""
+    return run_model_predictions(props_df)
+
+
+# -------------------------------------------------
+# Shared background refresher (one per server process)
+# -------------------------------------------------
+@st.cache_resource(show_spinner=False)
+def shared_refresher():
+    """Started once; every session reads the same SnapshotStore."""
+    return BackgroundRefresher(default_sources()).start()
+
+
+# -------------------------------------------------
+# Invalidation
+# -------------------------------------------------
+# Odds and games live in the refresher's SnapshotStore (refresh_now),
+# and "models" is the process-wide ModelRegistry rather than a wrapper
+SOURCES = {
+    "logs": [cached_player_summary],
+    "predictions": [cached_predictions],
+    "models": [],
+}
+
+
+def invalidate(*sources):
+    """Clear only the named cache groups (default: the live sources)."""
+    for source in sources or LIVE_SOURCES:
+        if source not in SOURCES:
+            raise ValueError(f"Unknown cache source: {source}")
+        for fn in SOURCES[source]:
+            fn.clear()
+        if source == "models":
+            from models.model_registry import get_registry
+
+            get_registry().clear()
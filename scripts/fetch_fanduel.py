@@ -1,53 +1,114 @@
-import requests
+import os
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 
-def fetch_fanduel_props():
-    """Fetch NBA player prop markets from FanDuel's internal API."""
+from scripts.http_cache import get_json
+from scripts.odds_utils import pair_outcomes, split_side
+from scripts.rate_limit import configure_host
+
+FANDUEL_NAV_URL = "https://sportsbook.fanduel.com/api/content/navigation/nba"
+FANDUEL_EVENT_URL = "https://sportsbook.fanduel.com/api/content/v1/events/{eid}"
+FANDUEL_MAX_WORKERS = int(os.getenv("FANDUEL_MAX_WORKERS", "6"))
+FANDUEL_RATE_PER_SEC = float(os.getenv("FANDUEL_RATE_PER_SEC", "4"))
+
+configure_host(FANDUEL_NAV_URL, rate=FANDUEL_RATE_PER_SEC)
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0",
+    "Accept": "application/json",
+}
+
+# One row per (game, player, market, line) once Over/Under are paired
+PROP_KEYS = ["game", "prop_type", "player", "line"]
+
+
+def _fetch_event_props(eid):
+    """Fetch one event's markets and flatten its player-prop outcomes (one row per side)."""
     try:
-        url = "https://sportsbook.fanduel.com/api/content/navigation/nba"
-        headers = {
-            "User-Agent": "Mozilla/5.0",
-            "Accept": "application/json",
-        }
+        ev = get_json(FANDUEL_EVENT_URL.format(eid=eid), headers=HEADERS, timeout=20).data or {}
+    except Exception as e:
+        print(f"⚠️ FanDuel event {eid} failed: {e}")
+        return []
+
+    game = ev.get("attachments", {}).get("events", {}).get(str(eid), {}).get("name", "")
+    markets = ev.get("attachments", {}).get("markets", {})
 
-        r = requests.get(url, headers=headers, timeout=20)
+    rows = []
+    for mk in markets.values():
+        name = mk.get("name", "")
+        if "Points" in name or "Rebounds" in name or "Assists" in name:
+            outcomes = mk.get("outcomes", {})
+            for out in outcomes.values():
+                sel = out.get("label", "")
+                price = out.get("price", {}).get("americanDisplay", "")
+                line = out.get("terms", {}).get("total", "")
+
+                rows.append({
+                    "game": game,
+                    "prop_type": name,
+                    "player": sel,
+                    "line": line,
+                    "price": price
+                })
+    return rows
+
+
+def _pair_props(outcomes: pd.DataFrame):
+    """
+    Outcome rows -> one row per (game, market, player, line) with
+    odds_over / odds_under and the no-vig probabilities. The side comes
+    from the selection label ("LeBron James Over"); bare "Over"/"Under"
+    labels take the player from "LeBron James - Points" market names.
+    Bare sides on any other market ("Total Points", "Lakers Total
+    Points") are game/team totals, not player props, and are dropped.
+    """
+    if outcomes.empty:
+        return outcomes
+    player, side = split_side(outcomes["player"])
+    market = outcomes["prop_type"].astype(str)
+    from_market = market.str.split(" - ").str[0].str.strip().where(market.str.contains(" - ", regex=False), "")
+    outcomes = outcomes.assign(
+        player=player.where(player != "", from_market),
+        side=side,
+        line=pd.to_numeric(outcomes["line"], errors="coerce"),
+    )
+    outcomes = outcomes[outcomes["player"] != ""]
+    return pair_outcomes(outcomes, PROP_KEYS)
+
+
+def fetch_fanduel_props(max_workers: int = None, max_events: int = None):
+    """
+    Fetch NBA player prop markets from FanDuel's internal API.
+    Event payloads are fetched concurrently (bounded by `max_workers`)
+    and rate limited per host; `max_events` optionally caps the slate.
+    Returns one row per prop with both prices (see _pair_props).
+    """
+    try:
+        r = get_json(FANDUEL_NAV_URL, headers=HEADERS, timeout=20)
         if r.status_code != 200:
             print(f"FanDuel API error {r.status_code}")
             return pd.DataFrame()
 
-        data = r.json()
+        data = r.data
 
         # Extract event IDs for NBA games
         event_ids = []
         for item in data.get("attachments", {}).get("events", {}).values():
             if item.get("state") == "open":
                 event_ids.append(item["id"])
+        if max_events:
+            event_ids = event_ids[:max_events]
 
         all_props = []
-        for eid in event_ids[:10]:  # limit to first 10 games to avoid overload
-            ev_url = f"https://sportsbook.fanduel.com/api/content/v1/events/{eid}"
-            ev = requests.get(ev_url, headers=headers, timeout=20).json()
-            markets = ev.get("attachments", {}).get("markets", {})
-
-            for mk in markets.values():
-                name = mk.get("name", "")
-                if "Points" in name or "Rebounds" in name or "Assists" in name:
-                    outcomes = mk.get("outcomes", {})
-                    for out in outcomes.values():
-                        sel = out.get("label", "")
-                        price = out.get("price", {}).get("americanDisplay", "")
-                        line = out.get("terms", {}).get("total", "")
-
-                        all_props.append({
-                            "game": ev.get("attachments", {}).get("events", {}).get(str(eid), {}).get("name", ""),
-                            "prop_type": name,
-                            "player": sel,
-                            "line": line,
-                            "odds": price
-                        })
-
-        df = pd.DataFrame(all_props)
-        print(f"✅ Loaded {len(df)} FanDuel props")
+        if event_ids:
+            workers = max(1, min(max_workers or FANDUEL_MAX_WORKERS, len(event_ids)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # map() keeps slate order regardless of completion order
+                for rows in pool.map(_fetch_event_props, event_ids):
+                    all_props.extend(rows)
+
+        df = _pair_props(pd.DataFrame(all_props))
+        print(f"✅ Loaded {len(df)} FanDuel props from {len(event_ids)} events")
         return df
 
     except Exception as e:
@@ -6,16 +6,21 @@
 
 import os
 import json
-import requests
 import pandas as pd
 from datetime import datetime
 from dotenv import load_dotenv
 
+from scripts.http_cache import get_json
+from scripts.odds_utils import pair_outcomes
+
 # Load API key from environment (.env) or Streamlit secrets
 load_dotenv()
 ODDS_API_KEY = os.getenv("ODDS_API_KEY") or "74bf14afd2c0ee8883e47d044ffe37e2"
 ODDS_API_URL = "https://api.the-odds-api.com/v4/sports/basketball_nba/odds/"
 
+# One row per (game, book, player, market, line) once Over/Under are paired
+PROP_KEYS = ["game", "book", "prop_type", "player", "line"]
+
 def fetch_oddsapi_data():
     """
     Fetch NBA player prop odds from The Odds API.
@@ -29,12 +34,12 @@ def fetch_oddsapi_data():
             "markets": "player_points,player_rebounds,player_assists,player_threes",
             "oddsFormat": "american"
         }
-        response = requests.get(ODDS_API_URL, params=params, timeout=15)
+        response = get_json(ODDS_API_URL, params=params, timeout=15)
         if response.status_code != 200:
-            print(f"⚠️ Odds API request failed: {response.status_code} - {response.text}")
+            print(f"⚠️ Odds API request failed: {response.status_code}")
             return pd.DataFrame()
 
-        data = response.json()
+        data = response.data
         props_list = []
 
         for game in data:
@@ -48,7 +53,9 @@ def fetch_oddsapi_data():
                     market_key = market.get("key", "")
                     for outcome in market.get("outcomes", []):
                         try:
-                            player = outcome.get("name", "").strip()
+                            # Player props: name is the side, description the player
+                            side = outcome.get("name", "").strip().lower()
+                            player = (outcome.get("description") or outcome.get("name", "")).strip()
                             line = outcome.get("point")
                             odds = outcome.get("price")
                             prop_type = (
@@ -62,17 +69,20 @@ def fetch_oddsapi_data():
                                 "player": player,
                                 "prop_type": prop_type,
                                 "line": line,
-                                "odds_over": odds,
-                                "odds_under": None,
+                                "side": side,
+                                "price": odds,
                                 "book": book,
                                 "game": f"{away_team} @ {home_team}",
-                                "source": "The Odds API",
-                                "timestamp": datetime.utcnow().isoformat()
                             })
                         except Exception:
                             continue
 
+        # Over/Under outcomes -> one row with both prices and no-vig probabilities
         df = pd.DataFrame(props_list)
+        if not df.empty:
+            df = pair_outcomes(df, PROP_KEYS)
+            df["source"] = "The Odds API"
+            df["timestamp"] = datetime.utcnow().isoformat()
         if df.empty:
             print("⚠️ No props returned from The Odds API.")
             return pd.DataFrame()
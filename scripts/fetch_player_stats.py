@@ -3,42 +3,117 @@
 # -------------------------------------------------
 # Hot Shot Props — Player Stats Fetcher (Stable Build)
 # Fetches player game logs safely via nba_api with retry, caching,
-# and fallback to local JSON if NBA API rate-limits or times out.
+# and fallback to the local Parquet log store if NBA API rate-limits
+# or times out.
 # -------------------------------------------------
 
 import os
-import json
 import time
 import pandas as pd
-from datetime import datetime
-from nba_api.stats.static import players
-from nba_api.stats.endpoints import playergamelog
+from datetime import datetime, timedelta
+from nba_api.stats.endpoints import playergamelog, leaguegamelog
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from requests.exceptions import ReadTimeout, ConnectionError
 
+from scripts.player_index import resolve_player_id
+from scripts.rate_limit import NBA_STATS_BUCKET, AdaptiveTokenBucket
+from scripts.log_store import (
+    load_logs, last_games, last_synced, mark_synced, normalize_logs, upsert_logs,
+)
+
 # -------------------------------------------------
-# PATHS
+# SETTINGS
 # -------------------------------------------------
-DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "player_logs")
-os.makedirs(DATA_DIR, exist_ok=True)
+# Logs live in scripts/log_store.py (data/game_logs/season=<season>.parquet);
+# old data/player_logs/*.json caches can be migrated with
+# log_store.import_legacy_json().
+CACHE_TTL_SECONDS = 43200
+NBA_STATS_WORKERS = int(os.getenv("NBA_STATS_WORKERS", "4"))
+NBA_STATS_MAX_ATTEMPTS = 4
+# Schedule-driven refresh still re-checks anyone not synced for this long
+# (covers trades, where the last stored MATCHUP shows the old team)
+MAX_SYNC_AGE_DAYS = 3
+
+
+class ThrottledError(Exception):
+    """stats.nba.com answered 429/5xx instead of a game log."""
 
 
 # -------------------------------------------------
 # UTILITIES
 # -------------------------------------------------
 def _get_player_id(player_name: str):
-    """Resolve player ID from name (case-insensitive)."""
+    """Resolve player ID from name (accent/suffix-insensitive, indexed)."""
     try:
-        all_players = players.get_players()
-        match = next((p for p in all_players if p["full_name"].lower() == player_name.lower()), None)
-        return match["id"] if match else None
+        return resolve_player_id(player_name)
     except Exception as e:
         print(f"⚠️ Error resolving ID for {player_name}: {e}")
         return None
 
 
-def _cache_path(player_name: str, season: str):
-    safe_name = player_name.replace(" ", "_").lower()
-    return os.path.join(DATA_DIR, f"{safe_name}_{season}.json")
+def _is_fresh(synced_at):
+    if synced_at is None or pd.isna(synced_at):
+        return False
+    return (datetime.utcnow() - synced_at).total_seconds() < CACHE_TTL_SECONDS
+
+
+def _game_day(utc_ts):
+    """Naive UTC timestamp -> US/Eastern calendar date, the day GAME_DATE is reported on."""
+    return pd.Timestamp(utc_ts).tz_localize("UTC").tz_convert("US/Eastern").tz_localize(None).normalize()
+
+
+def _team_from_matchup(matchup):
+    """'LAL vs. BOS' / 'LAL @ BOS' -> 'LAL'."""
+    return str(matchup).split(" ")[0] if isinstance(matchup, str) and matchup else None
+
+
+# -------------------------------------------------
+# CACHE + NETWORK
+# -------------------------------------------------
+def _summarize(df: pd.DataFrame):
+    return {"games": len(df), "avg_pts": df["PTS"].mean() if "PTS" in df else None}
+
+
+def _load_cached_logs(pid: int, season: str):
+    """Return the stored season log if it is fresh, else None."""
+    try:
+        if not _is_fresh(last_synced(season).get(pid)):
+            return None
+        df = load_logs(season, player_ids=[pid])
+    except Exception:
+        return None
+    return df if not df.empty else None
+
+
+def _fetch_logs(pid: int, player_name: str, season: str, persist: bool = True, date_from=None):
+    """
+    Fetch a season log from stats.nba.com, typed to the store schema.
+    With `date_from` only games on/after that date are requested.
+    Upserts into the log store unless `persist=False`. Raises on failure.
+    """
+    kwargs = {}
+    if date_from is not None:
+        kwargs["date_from_nullable"] = pd.Timestamp(date_from).strftime("%m/%d/%Y")
+    gamelog = playergamelog.PlayerGameLog(player_id=pid, season=season, timeout=30, **kwargs)
+    status = getattr(gamelog.nba_response, "_status_code", 200)
+    if status == 429 or status >= 500:
+        raise ThrottledError(f"HTTP {status}")
+    df = gamelog.get_data_frames()[0]
+    df["PLAYER_NAME"] = player_name
+    df["fetched_at"] = datetime.utcnow()
+
+    df = normalize_logs(df)
+    if persist:
+        upsert_logs(df, season)
+        mark_synced(season, [pid], datetime.utcnow())
+    return df
+
+
+def _next_date_from(pid: int, latest: pd.DataFrame):
+    """Day after the player's last stored game, or None for a full-season pull."""
+    if pid not in latest.index or pd.isna(latest.at[pid, "GAME_DATE"]):
+        return None
+    return latest.at[pid, "GAME_DATE"] + timedelta(days=1)
 
 
 # -------------------------------------------------
@@ -47,6 +122,7 @@ def _cache_path(player_name: str, season: str):
 def get_player_stats_summary(player_name: str, prop_type: str = None, season: str = "2024-25"):
     """
     Fetch player logs for a given player name and optional prop type.
+    Stale logs are topped up with only the games since the last stored one.
     Returns (logs_df, summary_dict)
     """
     pid = _get_player_id(player_name)
@@ -54,29 +130,18 @@ def get_player_stats_summary(player_name: str, prop_type: str = None, season: st
         print(f"⚠️ Player not found: {player_name}")
         return pd.DataFrame(), {}
 
-    cache_file = _cache_path(player_name, season)
     # Load cache if available
-    if os.path.exists(cache_file) and (time.time() - os.path.getmtime(cache_file)) < 43200:
-        try:
-            with open(cache_file, "r") as f:
-                data = json.load(f)
-            df = pd.DataFrame(data)
-            summary = {"games": len(df), "avg_pts": df["PTS"].mean() if "PTS" in df else None}
-            return df, summary
-        except Exception:
-            pass
-
-    # Fetch new data
-    try:
-        gamelog = playergamelog.PlayerGameLog(player_id=pid, season=season, timeout=30)
-        df = gamelog.get_data_frames()[0]
-        df["PLAYER_NAME"] = player_name
-        df["fetched_at"] = datetime.utcnow().isoformat()
+    df = _load_cached_logs(pid, season)
+    if df is not None:
+        return df, _summarize(df)
 
-        df.to_json(cache_file, orient="records", indent=2)
-        summary = {"games": len(df), "avg_pts": df["PTS"].mean() if "PTS" in df else None}
-        print(f"✅ Saved logs for {player_name}")
-        return df, summary
+    # Fetch new data (incrementally when we already hold part of the season)
+    try:
+        date_from = _next_date_from(pid, last_games(season, [pid]))
+        new = _fetch_logs(pid, player_name, season, date_from=date_from)
+        df = load_logs(season, player_ids=[pid])
+        print(f"✅ Saved {len(new)} new games for {player_name}")
+        return df, _summarize(df)
 
     except Exception as e:
         print(f"⚠️ Error fetching logs for {player_name}: {e}")
@@ -85,19 +150,176 @@ def get_player_stats_summary(player_name: str, prop_type: str = None, season: st
 
 
 # -------------------------------------------------
-# BULK FETCH (Optional)
+# BULK FETCH
 # -------------------------------------------------
-def bulk_fetch_players(player_names, season="2024-25"):
-    """Fetch multiple players with progress display."""
-    all_logs = []
+def _fetch_with_backoff(pid: int, player_name: str, season: str, bucket: AdaptiveTokenBucket,
+                        date_from=None):
+    """Fetch one player through the shared bucket, backing off on 429s/timeouts."""
+    for attempt in range(1, NBA_STATS_MAX_ATTEMPTS + 1):
+        bucket.acquire()
+        try:
+            df = _fetch_logs(pid, player_name, season, persist=False, date_from=date_from)
+            bucket.reward()
+            return df
+        except (ThrottledError, ReadTimeout, ConnectionError) as e:
+            bucket.penalize()
+            if attempt == NBA_STATS_MAX_ATTEMPTS:
+                raise
+            print(f"⏳ Throttled on {player_name} ({e}); rate now {bucket.rate:.2f}/s")
+
+
+def _refresh_players(targets, season, max_workers=None, report=None):
+    """
+    Pull new games for `targets` [(name, pid)] on the worker pool, then
+    upsert everything in one write and mark the successes as synced.
+    Players already in the store are fetched incrementally.
+    Returns (name, pid) pairs that succeeded.
+    """
+    if not targets:
+        return []
+    latest = last_games(season, [pid for _, pid in targets])
+    workers = max(1, min(max_workers or NBA_STATS_WORKERS, len(targets)))
+
+    def _task(name, pid):
+        t0 = time.perf_counter()
+        date_from = _next_date_from(pid, latest)
+        try:
+            df = _fetch_with_backoff(pid, name, season, NBA_STATS_BUCKET, date_from=date_from)
+            mode = "incremental" if date_from is not None else "full"
+            return name, pid, df, time.perf_counter() - t0, f"{mode} +{len(df)} games"
+        except Exception as e:
+            return name, pid, None, time.perf_counter() - t0, f"failed: {e}"
+
+    frames, synced = [], []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_task, name, pid) for name, pid in targets]
+        for fut in as_completed(futures):
+            name, pid, df, latency, status = fut.result()
+            if df is not None:
+                synced.append((name, pid))
+                if not df.empty:
+                    frames.append(df)
+            if report:
+                report(name, latency, status)
+
+    if frames:
+        upsert_logs(pd.concat(frames, ignore_index=True), season)
+    mark_synced(season, [pid for _, pid in synced], datetime.utcnow())
+    return synced
+
+
+def _make_reporter(total, progress, latencies):
+    done = 0
+
+    def _report(name, latency, status):
+        nonlocal done
+        done += 1
+        latencies[name] = latency
+        if progress:
+            progress(done, total, name, latency, status)
+        else:
+            print(f"[{done}/{total}] {name}: {status} ({latency:.2f}s)")
+
+    return _report
+
+
+def bulk_fetch_players(player_names, season="2024-25", max_workers: int = None, progress=None):
+    """
+    Fetch many players' season logs and return one concatenated frame.
+    Fresh cache hits cost no network at all; stale players are topped up
+    on a worker pool governed by an adaptive token bucket and upserted in
+    one write. `progress(done, total, name, latency_s, status)` is called
+    after each player, if given.
+    """
+    latencies = {}
+    _report = _make_reporter(len(player_names), progress, latencies)
+
+    # Pass 1: split fresh vs stale from the store, no rate limiting needed
+    synced_at = last_synced(season)
+    resolved, misses = [], []
     for name in player_names:
-        logs = get_player_stats_summary(name, season)
-        if not logs.empty:
-            all_logs.append(logs)
-        time.sleep(1.5)  # rate-limit buffer
-    if not all_logs:
+        pid = _get_player_id(name)
+        if not pid:
+            _report(name, 0.0, "not found")
+            continue
+        resolved.append(pid)
+        if _is_fresh(synced_at.get(pid)):
+            _report(name, 0.0, "cache")
+        else:
+            misses.append((name, pid))
+
+    # Pass 2: network misses through the worker pool
+    _refresh_players(misses, season, max_workers, _report)
+
+    fetched = [latencies[name] for name, _ in misses if name in latencies]
+    if fetched:
+        print(f"✅ Bulk fetch: {len(resolved) - len(misses)} cached, {len(misses)} refreshed, "
+              f"avg {sum(fetched) / len(fetched):.2f}s / max {max(fetched):.2f}s per player")
+    if not resolved:
         return pd.DataFrame()
-    return pd.concat(all_logs, ignore_index=True)
+    return load_logs(season, player_ids=resolved)
+
+
+# -------------------------------------------------
+# SCHEDULE-DRIVEN INCREMENTAL REFRESH
+# -------------------------------------------------
+def teams_played_since(since, season="2024-25"):
+    """
+    One LeagueGameLog call -> {TEAM_ABBREVIATION: last GAME_DATE} for every
+    team that has played on/after `since`.
+    """
+    since = pd.Timestamp(since)
+    log = leaguegamelog.LeagueGameLog(
+        season=season,
+        player_or_team_abbreviation="T",
+        date_from_nullable=since.strftime("%m/%d/%Y"),
+        timeout=30,
+    ).get_data_frames()[0]
+    if log.empty:
+        return {}
+    log["GAME_DATE"] = pd.to_datetime(log["GAME_DATE"])
+    return log.groupby("TEAM_ABBREVIATION")["GAME_DATE"].max().to_dict()
+
+
+def incremental_refresh(player_names, season="2024-25", max_workers: int = None, progress=None):
+    """
+    Refresh only players whose team has played since their last sync,
+    asking stats.nba.com just for the games after their last stored one.
+    Players with nothing stored get a full pull. Returns the number of
+    players refreshed.
+    """
+    now = datetime.utcnow()
+    resolved = {name: pid for name, pid in ((n, _get_player_id(n)) for n in player_names) if pid}
+    synced_at = last_synced(season)
+    latest = last_games(season, list(resolved.values()))
+
+    known = [pid for pid in resolved.values() if pid in synced_at.index and pid in latest.index]
+    since = _game_day(min((synced_at[pid] for pid in known), default=now))
+    played = teams_played_since(since, season) if known else {}
+
+    targets = []
+    for name, pid in resolved.items():
+        if pid not in known:
+            targets.append((name, pid))
+            continue
+        last_sync = synced_at[pid]
+        team = _team_from_matchup(latest.at[pid, "MATCHUP"])
+        team_last_game = played.get(team)
+        # Same-day games may have been in progress at sync time, so compare
+        # game-day dates (sync times are UTC, GAME_DATE is US local)
+        if team_last_game is not None and team_last_game.normalize() >= _game_day(last_sync):
+            targets.append((name, pid))
+        elif (now - last_sync).days >= MAX_SYNC_AGE_DAYS:
+            targets.append((name, pid))
+
+    # Skipped players keep their old sync time so MAX_SYNC_AGE_DAYS still
+    # forces a real upstream check (trades, late stat corrections)
+    print(f"🔄 Incremental refresh: {len(targets)} of {len(resolved)} players need new games")
+
+    latencies = {}
+    synced = _refresh_players(targets, season, max_workers,
+                              _make_reporter(len(targets), progress, latencies))
+    return len(synced)
 
 
 # -------------------------------------------------
@@ -107,4 +329,3 @@ if __name__ == "__main__":
     test_players = ["LeBron James", "Stephen Curry", "Luka Doncic"]
     df = bulk_fetch_players(test_players)
     print(df.head())
-
@@ -7,10 +7,11 @@
 
 import os
 import json
-import requests
 import pandas as pd
 from datetime import datetime
 
+from scripts.http_client import http_get
+
 PRIZEPICKS_URL = "https://api.prizepicks.com/projections"
 
 def fetch_prizepicks_data():
@@ -21,7 +22,7 @@ def fetch_prizepicks_data():
     print("Fetching NBA props from PrizePicks fallback...")
     try:
         params = {"league_id": "7"}  # 7 = NBA
-        response = requests.get(PRIZEPICKS_URL, params=params, timeout=15)
+        response = http_get(PRIZEPICKS_URL, params=params, timeout=15)
         if response.status_code != 200:
             print(f"⚠️ PrizePicks request failed: {response.status_code}")
             return pd.DataFrame()
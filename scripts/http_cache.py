@@ -0,0 +1,180 @@
+# -------------------------------------------------
+# scripts/http_cache.py
+# -------------------------------------------------
+# Hot Shot Props — Conditional-Request HTTP Cache
+# Stores ETag / Last-Modified validators next to the parsed
+# JSON payload under data/http_cache and revalidates with
+# If-None-Match / If-Modified-Since. A 304 returns the cached
+# payload without re-downloading or re-parsing it. The in-memory
+# memo is LRU-bounded and disk entries older than
+# HTTP_CACHE_MAX_AGE_HOURS are pruned.
+# -------------------------------------------------
+
+import os
+import json
+import hashlib
+import time
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timedelta
+
+from scripts.http_client import http_get
+
+HTTP_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "http_cache")
+os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+
+HTTP_CACHE_MEMO_MAX = int(os.getenv("HTTP_CACHE_MEMO_MAX", "256"))
+# Slates turn over daily, so older validators/payloads are dead weight
+HTTP_CACHE_MAX_AGE_HOURS = float(os.getenv("HTTP_CACHE_MAX_AGE_HOURS", "48"))
+HTTP_CACHE_PRUNE_SECONDS = int(os.getenv("HTTP_CACHE_PRUNE_SECONDS", "3600"))
+
+# Query params that identify the caller rather than the resource
+_SECRET_PARAMS = {"apiKey", "api_key", "key"}
+
+CachedJSON = namedtuple("CachedJSON", ["status_code", "data", "not_modified"])
+
+# Parsed payloads kept in memory so repeated 304s skip json.load too;
+# least recently used entries are evicted past HTTP_CACHE_MEMO_MAX
+_MEMO = OrderedDict()
+_MEMO_LOCK = threading.Lock()
+_last_prune = 0.0
+
+
+def _cache_key(url: str, params=None):
+    items = sorted((k, str(v)) for k, v in (params or {}).items() if k not in _SECRET_PARAMS)
+    raw = url + "?" + "&".join(f"{k}={v}" for k, v in items)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _entry_path(key: str):
+    return os.path.join(HTTP_CACHE_DIR, f"{key}.json")
+
+
+def _remember(key: str, entry: dict):
+    with _MEMO_LOCK:
+        _MEMO[key] = entry
+        _MEMO.move_to_end(key)
+        while len(_MEMO) > HTTP_CACHE_MEMO_MAX:
+            _MEMO.popitem(last=False)
+
+
+def _expired(entry: dict):
+    try:
+        stored_at = datetime.fromisoformat(entry["stored_at"])
+    except (KeyError, TypeError, ValueError):
+        return True
+    return datetime.utcnow() - stored_at > timedelta(hours=HTTP_CACHE_MAX_AGE_HOURS)
+
+
+def _load_entry(key: str):
+    with _MEMO_LOCK:
+        entry = _MEMO.get(key)
+        if entry is not None:
+            _MEMO.move_to_end(key)
+    if entry is None:
+        path = _entry_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except Exception:
+            return None
+    if _expired(entry):
+        return None
+    _remember(key, entry)
+    return entry
+
+
+def _store_entry(key: str, entry: dict):
+    path = _entry_path(key)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(entry, f)
+    os.replace(tmp, path)
+    _remember(key, entry)
+    _maybe_prune()
+
+
+def prune_http_cache(max_age_hours: float = None):
+    """
+    Delete disk entries stored more than `max_age_hours` ago (default
+    HTTP_CACHE_MAX_AGE_HOURS) plus leftover temp files. Entries are only
+    rewritten on a 200, so file mtime is their stored_at. Returns the
+    number of files removed.
+    """
+    max_age = HTTP_CACHE_MAX_AGE_HOURS if max_age_hours is None else max_age_hours
+    cutoff = time.time() - max_age * 3600
+    removed = 0
+    for name in os.listdir(HTTP_CACHE_DIR):
+        if not (name.endswith(".json") or name.endswith(".tmp")):
+            continue
+        path = os.path.join(HTTP_CACHE_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            continue  # Raced with another writer/pruner
+    with _MEMO_LOCK:
+        for key in [k for k, e in _MEMO.items() if _expired(e)]:
+            del _MEMO[key]
+    return removed
+
+
+def _maybe_prune():
+    """Prune at most once per HTTP_CACHE_PRUNE_SECONDS, piggybacking on writes."""
+    global _last_prune
+    now = time.monotonic()
+    with _MEMO_LOCK:
+        if _last_prune and now - _last_prune < HTTP_CACHE_PRUNE_SECONDS:
+            return
+        _last_prune = now
+    removed = prune_http_cache()
+    if removed:
+        print(f"🧹 Pruned {removed} expired HTTP cache entries")
+
+
+def get_json(url: str, params=None, headers=None, timeout=20):
+    """
+    Conditional GET returning CachedJSON(status_code, data, not_modified).
+    A 304 is reported as status 200 with the cached payload and
+    not_modified=True; other non-200 statuses return data=None.
+    """
+    key = _cache_key(url, params)
+    entry = _load_entry(key)
+
+    req_headers = dict(headers or {})
+    if entry:
+        if entry.get("etag"):
+            req_headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            req_headers["If-Modified-Since"] = entry["last_modified"]
+
+    r = http_get(url, params=params, headers=req_headers, timeout=timeout)
+    if r.status_code == 304 and entry:
+        return CachedJSON(200, entry["payload"], True)
+    if r.status_code != 200:
+        return CachedJSON(r.status_code, None, False)
+
+    payload = r.json()
+    etag = r.headers.get("ETag")
+    last_modified = r.headers.get("Last-Modified")
+    if etag or last_modified:
+        _store_entry(key, {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": datetime.utcnow().isoformat(),
+            "payload": payload,
+        })
+    return CachedJSON(200, payload, False)
+
+
+def clear_http_cache():
+    """Drop every stored validator/payload (memory and disk)."""
+    with _MEMO_LOCK:
+        _MEMO.clear()
+    for name in os.listdir(HTTP_CACHE_DIR):
+        if name.endswith(".json"):
+            os.remove(os.path.join(HTTP_CACHE_DIR, name))
@@ -0,0 +1,153 @@
+# -------------------------------------------------
+# scripts/http_client.py
+# -------------------------------------------------
+# Hot Shot Props — Shared HTTP Transport
+# Pooled keep-alive sessions per host with retry/backoff,
+# compressed transfers, per-host connection limits and
+# per-call timing counters used by every fetch_* module.
+# -------------------------------------------------
+
+import os
+import time
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from scripts.rate_limit import throttle
+
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "8"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+try:  # requests/urllib3 only decode br when a brotli binding is installed
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+
+# -------------------------------------------------
+# Session pool (one per host)
+# -------------------------------------------------
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def _host(url: str):
+    return urlparse(url).netloc
+
+
+def _build_session():
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    # pool_block caps concurrent connections per host at HTTP_POOL_MAXSIZE
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_MAXSIZE,
+                          pool_block=True, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept-Encoding": ACCEPT_ENCODING,
+        "Connection": "keep-alive",
+    })
+    return session
+
+
+def get_session(url: str):
+    """Return the shared keep-alive session for the URL's host."""
+    host = _host(url)
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(host)
+        if session is None:
+            session = _build_session()
+            _SESSIONS[host] = session
+        return session
+
+
+# -------------------------------------------------
+# Timing counters
+# -------------------------------------------------
+_STATS = {}
+_STATS_LOCK = threading.Lock()
+
+
+def _record(host: str, total_s: float, ttfb_s: float, ok: bool):
+    with _STATS_LOCK:
+        s = _STATS.setdefault(host, {"calls": 0, "errors": 0, "total_s": 0.0,
+                                     "ttfb_s": 0.0, "max_s": 0.0})
+        s["calls"] += 1
+        s["errors"] += 0 if ok else 1
+        s["total_s"] += total_s
+        s["ttfb_s"] += ttfb_s
+        s["max_s"] = max(s["max_s"], total_s)
+
+
+def _connections_opened(host: str):
+    """Number of TCP/TLS connections the host's pool has created so far."""
+    session = _SESSIONS.get(host)
+    if session is None:
+        return 0
+    adapter = session.get_adapter(f"https://{host}")
+    pools = getattr(adapter.poolmanager, "pools", None)
+    if pools is None:
+        return 0
+    return sum(getattr(pools[key], "num_connections", 0) for key in list(pools.keys()))
+
+
+def timing_stats():
+    """
+    Per-host counters: calls, errors, total/ttfb/max seconds and
+    connections opened. calls >> connections means keep-alive is working;
+    total_s - ttfb_s is time spent reading bodies.
+    """
+    with _STATS_LOCK:
+        snapshot = {host: dict(s) for host, s in _STATS.items()}
+    for host, s in snapshot.items():
+        s["connections"] = _connections_opened(host)
+        s["avg_s"] = s["total_s"] / s["calls"] if s["calls"] else 0.0
+    return snapshot
+
+
+def reset_timing_stats():
+    with _STATS_LOCK:
+        _STATS.clear()
+
+
+def print_timing_summary():
+    for host, s in sorted(timing_stats().items()):
+        print(f"⏱️ {host}: {s['calls']} calls / {s['connections']} conns, "
+              f"total {s['total_s']:.2f}s (ttfb {s['ttfb_s']:.2f}s, max {s['max_s']:.2f}s)")
+
+
+# -------------------------------------------------
+# Request helper
+# -------------------------------------------------
+def http_get(url: str, params=None, headers=None, timeout=20):
+    """
+    GET through the pooled session for the URL's host, waiting on the
+    host's rate-limit bucket first. Returns the `requests.Response`.
+    """
+    host = _host(url)
+    throttle(url)
+    start = time.perf_counter()
+    try:
+        r = get_session(url).get(url, params=params, headers=headers, timeout=timeout)
+    except Exception:
+        _record(host, time.perf_counter() - start, 0.0, ok=False)
+        raise
+    _record(host, time.perf_counter() - start, r.elapsed.total_seconds(), ok=r.ok)
+    return r
@@ -0,0 +1,196 @@
+# -------------------------------------------------
+# scripts/log_store.py
+# -------------------------------------------------
+# Hot Shot Props — Columnar Game-Log Store
+# One typed Parquet file per season under data/game_logs,
+# upserted on (PLAYER_ID, GAME_ID). Loading the league's logs
+# for feature building is a single vectorized read.
+# -------------------------------------------------
+
+import os
+import glob
+import json
+import threading
+import pandas as pd
+
+LOG_STORE_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "game_logs")
+os.makedirs(LOG_STORE_DIR, exist_ok=True)
+
+KEY_COLS = ["PLAYER_ID", "GAME_ID"]
+
+# Column -> dtype for everything PlayerGameLog returns plus our metadata
+LOG_SCHEMA = {
+    "SEASON_ID": "string",
+    "PLAYER_ID": "int64",
+    "GAME_ID": "string",
+    "GAME_DATE": "datetime64[ns]",
+    "MATCHUP": "string",
+    "WL": "string",
+    "MIN": "float32",
+    "FGM": "float32",
+    "FGA": "float32",
+    "FG_PCT": "float32",
+    "FG3M": "float32",
+    "FG3A": "float32",
+    "FG3_PCT": "float32",
+    "FTM": "float32",
+    "FTA": "float32",
+    "FT_PCT": "float32",
+    "OREB": "float32",
+    "DREB": "float32",
+    "REB": "float32",
+    "AST": "float32",
+    "STL": "float32",
+    "BLK": "float32",
+    "TOV": "float32",
+    "PF": "float32",
+    "PTS": "float32",
+    "PLUS_MINUS": "float32",
+    "PLAYER_NAME": "string",
+    "fetched_at": "datetime64[ns]",
+}
+
+_WRITE_LOCK = threading.Lock()
+
+
+def _season_path(season: str):
+    return os.path.join(LOG_STORE_DIR, f"season={season}.parquet")
+
+
+def _empty_frame():
+    return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in LOG_SCHEMA.items()})
+
+
+def normalize_logs(df: pd.DataFrame):
+    """Coerce a raw PlayerGameLog frame to the store schema (column names + dtypes)."""
+    if df is None or df.empty:
+        return _empty_frame()
+    df = df.rename(columns={"Player_ID": "PLAYER_ID", "Game_ID": "GAME_ID"})
+    out = pd.DataFrame(index=df.index)
+    for col, dtype in LOG_SCHEMA.items():
+        if col not in df.columns:
+            out[col] = pd.Series(pd.NA if dtype == "string" else None, index=df.index).astype(dtype)
+        elif dtype.startswith("datetime"):
+            # PlayerGameLog dates look like "OCT 22, 2024"; stored ones are ISO
+            out[col] = pd.to_datetime(df[col], format="mixed", errors="coerce")
+        elif dtype.startswith("float"):
+            out[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+        else:
+            out[col] = df[col].astype(dtype)
+    return out.reset_index(drop=True)
+
+
+# -------------------------------------------------
+# Read
+# -------------------------------------------------
+def load_logs(season: str, player_ids=None, columns=None):
+    """
+    Load a season's logs in one read, optionally filtered to `player_ids`
+    (pushed down to Parquet) and projected to `columns`.
+    """
+    path = _season_path(season)
+    if not os.path.exists(path):
+        empty = _empty_frame()
+        return empty[columns] if columns else empty
+    filters = [("PLAYER_ID", "in", [int(p) for p in player_ids])] if player_ids is not None else None
+    return pd.read_parquet(path, columns=columns, filters=filters)
+
+
+def load_seasons(seasons, player_ids=None, columns=None):
+    """Concatenate several seasons' logs."""
+    frames = [load_logs(s, player_ids, columns) for s in seasons]
+    return pd.concat(frames, ignore_index=True) if frames else _empty_frame()
+
+
+def last_fetched(season: str):
+    """Series PLAYER_ID -> most recent fetched_at in the store."""
+    df = load_logs(season, columns=["PLAYER_ID", "fetched_at"])
+    return df.groupby("PLAYER_ID")["fetched_at"].max()
+
+
+def last_games(season: str, player_ids=None):
+    """Frame indexed by PLAYER_ID with the latest stored GAME_DATE, GAME_ID and MATCHUP."""
+    df = load_logs(season, player_ids, columns=["PLAYER_ID", "GAME_ID", "GAME_DATE", "MATCHUP"])
+    return df.sort_values("GAME_DATE").groupby("PLAYER_ID").tail(1).set_index("PLAYER_ID")
+
+
+# -------------------------------------------------
+# Sync state
+# -------------------------------------------------
+def _sync_path(season: str):
+    return os.path.join(LOG_STORE_DIR, f"sync_state_{season}.json")
+
+
+def load_sync_state(season: str):
+    """Series PLAYER_ID -> last time the player's log was checked upstream."""
+    path = _sync_path(season)
+    if not os.path.exists(path):
+        return pd.Series(dtype="datetime64[ns]")
+    with open(path, "r") as f:
+        raw = json.load(f)
+    return pd.Series({int(pid): pd.Timestamp(ts) for pid, ts in raw.items()}, dtype="datetime64[ns]")
+
+
+def mark_synced(season: str, player_ids, when):
+    """Record that `player_ids` were checked upstream at `when`, even if nothing new came back."""
+    player_ids = list(player_ids)
+    if not player_ids:
+        return
+    with _WRITE_LOCK:
+        state = load_sync_state(season)
+        for pid in player_ids:
+            state[int(pid)] = pd.Timestamp(when)
+        path = _sync_path(season)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({str(pid): ts.isoformat() for pid, ts in state.items()}, f)
+        os.replace(tmp, path)
+
+
+def last_synced(season: str):
+    """Series PLAYER_ID -> latest of sync-state time and stored fetched_at."""
+    fetched = last_fetched(season)
+    synced = load_sync_state(season)
+    if synced.empty:
+        return fetched
+    return pd.concat([fetched, synced], axis=1).max(axis=1)
+
+
+# -------------------------------------------------
+# Write
+# -------------------------------------------------
+def upsert_logs(df: pd.DataFrame, season: str):
+    """
+    Insert or replace rows keyed by (PLAYER_ID, GAME_ID); newer rows win.
+    The season file is rewritten atomically. Returns the stored row count.
+    """
+    new = normalize_logs(df)
+    if new.empty:
+        return 0
+    path = _season_path(season)
+    with _WRITE_LOCK:
+        if os.path.exists(path):
+            merged = pd.concat([pd.read_parquet(path), new], ignore_index=True)
+        else:
+            merged = new
+        merged = merged.drop_duplicates(subset=KEY_COLS, keep="last")
+        merged = merged.sort_values(["PLAYER_ID", "GAME_DATE"]).reset_index(drop=True)
+        tmp = f"{path}.tmp"
+        merged.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+    return len(merged)
+
+
+def import_legacy_json(json_dir: str):
+    """One-off migration of the old per-player `<name>_<season>.json` cache files."""
+    by_season = {}
+    for path in glob.glob(os.path.join(json_dir, "*_*.json")):
+        season = os.path.splitext(os.path.basename(path))[0].rsplit("_", 1)[-1]
+        try:
+            with open(path, "r") as f:
+                by_season.setdefault(season, []).append(pd.DataFrame(json.load(f)))
+        except Exception as e:
+            print(f"⚠️ Skipping {path}: {e}")
+    for season, frames in by_season.items():
+        n = upsert_logs(pd.concat(frames, ignore_index=True), season)
+        print(f"✅ Imported {len(frames)} legacy files into {season} store ({n} rows)")
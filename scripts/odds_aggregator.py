@@ -0,0 +1,212 @@
+# -------------------------------------------------
+# scripts/odds_aggregator.py
+# -------------------------------------------------
+# Hot Shot Props — Multi-Book Prop Aggregation
+# Normalizes FanDuel, The Odds API and PrizePicks frames into one
+# typed schema (PROPS_COLUMNS: one row per player/market/line/book
+# with both prices and no-vig probabilities) keyed by NBA player ID
+# and model market. Sources are tried in priority order and a fallback is
+# only used when everything ahead of it failed, came back empty or
+# is stale; the result is de-duplicated on
+# (player_id, market, line, book).
+# -------------------------------------------------
+
+import os
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from models.features import STAT_LABELS, stat_code
+from scripts.fetch_fanduel import fetch_fanduel_props
+from scripts.fetch_oddsapi import fetch_oddsapi_data
+from scripts.fetch_prizepicks import fetch_prizepicks_data
+from scripts.odds_utils import american_odds, no_vig
+from scripts.player_index import resolve_players
+
+MAX_PROPS_AGE_SECONDS = int(os.getenv("MAX_PROPS_AGE_SECONDS", "300"))
+AGGREGATE_TIMEOUT_SECONDS = float(os.getenv("AGGREGATE_TIMEOUT_SECONDS", "45"))
+
+PROPS_COLUMNS = ["player", "player_id", "market", "prop_type", "line", "odds_over", "odds_under",
+                 "no_vig_over", "no_vig_under", "book", "source", "game", "fetched_at"]
+PROPS_DTYPES = {
+    "player": "object", "player_id": "Int64", "market": "object", "prop_type": "object",
+    "line": "float64", "odds_over": "Int64", "odds_under": "Int64",
+    "no_vig_over": "float64", "no_vig_under": "float64", "book": "object",
+    "source": "object", "game": "object", "fetched_at": "datetime64[ns]",
+}
+DEDUPE_KEYS = ["player_id", "market", "line", "book"]
+
+# Most trusted first; refresher snapshot names (scripts/refresher.py)
+SOURCE_PRIORITY = ["odds", "oddsapi", "prizepicks"]
+SOURCE_FETCHERS = {
+    "odds": fetch_fanduel_props,
+    "oddsapi": fetch_oddsapi_data,
+    "prizepicks": fetch_prizepicks_data,
+}
+
+# Longest phrases first so "Points + Rebounds + Assists" isn't read as Points
+_MARKET_KEYWORDS = [
+    (("pts + reb + ast", "points + rebounds + assists", "pts+reb+ast", "pra"), "PRA"),
+    (("three", "3-pt", "3pt", "3pm"), "FG3M"),
+    (("rebound",), "REB"),
+    (("assist",), "AST"),
+    (("point",), "PTS"),
+]
+
+
+def empty_props():
+    return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in PROPS_DTYPES.items()})
+
+
+def market_code(label):
+    """Exact label lookup first, then keyword match for book-specific market names."""
+    code = stat_code(label)
+    if code:
+        return code
+    text = str(label).lower()
+    for words, code in _MARKET_KEYWORDS:
+        if any(w in text for w in words):
+            return code
+    return None
+
+
+# -------------------------------------------------
+# Per-source normalizers -> canonical columns (before IDs)
+# -------------------------------------------------
+def _normalize_fanduel(df: pd.DataFrame):
+    # fetch_fanduel_props already pairs Over/Under into one row
+    return df.assign(book="FanDuel", source="FanDuel")
+
+
+def _normalize_oddsapi(df: pd.DataFrame):
+    return df.assign(source="The Odds API")
+
+
+def _normalize_prizepicks(df: pd.DataFrame):
+    return df.assign(source="PrizePicks", game=df.get("game"))
+
+
+NORMALIZERS = {
+    "odds": _normalize_fanduel,
+    "oddsapi": _normalize_oddsapi,
+    "prizepicks": _normalize_prizepicks,
+}
+
+
+def normalize_props(df: pd.DataFrame, source: str, fetched_at=None):
+    """One source's raw frame -> canonical PROPS_COLUMNS with typed columns and player IDs."""
+    if df is None or df.empty:
+        return empty_props()
+    out = NORMALIZERS[source](df.copy())
+    out["market"] = out["prop_type"].map(market_code)
+    unknown = out["market"].isna().sum()
+    if unknown:
+        print(f"⚠️ {source}: dropped {unknown} props with unrecognized markets")
+    out = out[out["market"].notna()].copy()
+    out["prop_type"] = out["market"].map(STAT_LABELS)
+    out["player"] = out["player"].astype(str).str.strip()
+
+    ids = resolve_players(out["player"].unique().tolist())
+    out["player_id"] = out["player"].map(ids)
+    # Anything that isn't a known NBA player (team totals, combo lines) has no model
+    unresolved = out["player_id"].isna().sum()
+    if unresolved:
+        print(f"⚠️ {source}: dropped {unresolved} props with unresolved players")
+    out = out[out["player_id"].notna()].copy()
+    out["line"] = pd.to_numeric(out["line"], errors="coerce")
+    out["odds_over"] = american_odds(out.get("odds_over"))
+    out["odds_under"] = american_odds(out.get("odds_under"))
+    # Recomputed for every source so the column means the same thing everywhere
+    out["no_vig_over"], out["no_vig_under"] = no_vig(out["odds_over"], out["odds_under"])
+    out["fetched_at"] = pd.Timestamp(fetched_at or datetime.now())
+    for col in PROPS_COLUMNS:
+        if col not in out.columns:
+            out[col] = None
+    return out[PROPS_COLUMNS].astype(PROPS_DTYPES).reset_index(drop=True)
+
+
+def dedupe_props(props: pd.DataFrame):
+    """Newest row per DEDUPE_KEYS."""
+    keyed = props.sort_values("fetched_at", ascending=False, kind="stable")
+    return keyed.drop_duplicates(subset=DEDUPE_KEYS).sort_index().reset_index(drop=True)
+
+
+# -------------------------------------------------
+# Fallback chain
+# -------------------------------------------------
+def _usable(df, fetched_at, error, max_age: float):
+    if error or df is None or df.empty or fetched_at is None:
+        return False
+    return (datetime.now() - fetched_at).total_seconds() <= max_age
+
+
+def props_usable(snapshot, max_age: float = MAX_PROPS_AGE_SECONDS):
+    """True if a refresher Snapshot can serve props: no error, not empty, fresh."""
+    if snapshot is None:
+        return False
+    return _usable(snapshot.data, snapshot.fetched_at, snapshot.error, max_age)
+
+
+def combine_sources(results: dict, max_age: float = MAX_PROPS_AGE_SECONDS):
+    """
+    `results` maps source -> (raw frame, fetched_at, error). Walks
+    SOURCE_PRIORITY and stops at the first usable source (fresh, no error,
+    not empty). Returns (canonical frame, source used or None).
+    """
+    for source in SOURCE_PRIORITY:
+        df, fetched_at, error = results.get(source, (None, None, "not fetched"))
+        if not _usable(df, fetched_at, error, max_age):
+            continue
+        props = normalize_props(df, source, fetched_at)
+        if props.empty:
+            continue
+        return dedupe_props(props), source
+    return empty_props(), None
+
+
+def aggregate_from_store(store, max_age: float = MAX_PROPS_AGE_SECONDS):
+    """Canonical props from the refresher's latest snapshots (no network)."""
+    results = {}
+    for source in SOURCE_PRIORITY:
+        snap = store.get(source)
+        if snap is not None:
+            results[source] = (snap.data, snap.fetched_at, snap.error)
+    return combine_sources(results, max_age)
+
+
+def props_ready(store, max_age: float = MAX_PROPS_AGE_SECONDS):
+    """
+    True once the chain can be resolved without guessing: some source is
+    usable and every source ahead of it has reported, or all have reported.
+    """
+    for source in SOURCE_PRIORITY:
+        snap = store.get(source)
+        if snap is None:
+            return False
+        if props_usable(snap, max_age):
+            return True
+    return True
+
+
+def fetch_aggregated_props(timeout: float = AGGREGATE_TIMEOUT_SECONDS, max_age: float = MAX_PROPS_AGE_SECONDS):
+    """
+    Standalone path (scripts, notebooks): fetch every source concurrently,
+    give up on any still running after `timeout`, then apply the chain.
+    """
+    pool = ThreadPoolExecutor(max_workers=len(SOURCE_FETCHERS))
+    futures = {pool.submit(fn): source for source, fn in SOURCE_FETCHERS.items()}
+    done, _ = wait(futures, timeout=timeout)
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    results = {}
+    for fut, source in futures.items():
+        if fut not in done:
+            results[source] = (None, None, f"timed out after {timeout}s")
+        elif fut.exception() is not None:
+            results[source] = (None, None, str(fut.exception()))
+        else:
+            results[source] = (fut.result(), datetime.now(), None)
+    props, used = combine_sources(results, max_age)
+    print(f"✅ Aggregated {len(props)} props from {used or 'no source'}")
+    return props
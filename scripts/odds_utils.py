@@ -0,0 +1,71 @@
+# -------------------------------------------------
+# scripts/odds_utils.py
+# -------------------------------------------------
+# Hot Shot Props — Odds Helpers
+# Vectorized American-odds parsing, implied and no-vig
+# probabilities, and pairing of per-outcome rows (one Over, one
+# Under) into a single row per (player, market, line).
+# -------------------------------------------------
+
+import re
+
+import numpy as np
+import pandas as pd
+
+SIDE_RE = re.compile(r"\s*\b(over|under)\s*$", re.IGNORECASE)
+
+
+def american_odds(values):
+    """'+120' / '-110' / 120 -> nullable Int64 American odds."""
+    cleaned = pd.Series(values, dtype="object").astype(str).str.replace("+", "", regex=False).str.strip()
+    return pd.to_numeric(cleaned, errors="coerce").round().astype("Int64")
+
+
+def implied_prob(odds):
+    """Vectorized American odds -> implied probability (vig included); NaN where missing."""
+    o = pd.to_numeric(pd.Series(odds, dtype="object"), errors="coerce").to_numpy(dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(o < 0, -o / (-o + 100.0), 100.0 / (o + 100.0))
+
+
+def no_vig(odds_over, odds_under):
+    """
+    Market-implied fair (no-vig) probabilities: each side's implied
+    probability divided by the two-sided total. NaN unless both prices exist.
+    """
+    p_over, p_under = implied_prob(odds_over), implied_prob(odds_under)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        total = p_over + p_under
+        return p_over / total, p_under / total
+
+
+def split_side(labels: pd.Series):
+    """'LeBron James Over' -> ('LeBron James', 'over'); a bare 'Over' leaves the name empty."""
+    labels = labels.fillna("").astype(str)
+    side = labels.str.extract(SIDE_RE, expand=False).str.lower()
+    name = labels.str.replace(SIDE_RE, "", regex=True).str.strip()
+    return name, side
+
+
+def pair_outcomes(rows: pd.DataFrame, keys, side_col: str = "side", price_col: str = "price"):
+    """
+    Pivot one-row-per-outcome frames (side in `side_col`, price in
+    `price_col`) to one row per `keys` with odds_over / odds_under and
+    no_vig_over / no_vig_under. Outcomes that aren't Over/Under are dropped.
+    """
+    keys = list(keys)
+    out_cols = keys + ["odds_over", "odds_under", "no_vig_over", "no_vig_under"]
+    rows = rows[rows[side_col].isin(["over", "under"])]
+    if rows.empty:
+        return pd.DataFrame(columns=out_cols)
+    wide = (rows.assign(**{price_col: american_odds(rows[price_col]).to_numpy()})
+            .groupby(keys + [side_col], sort=False, dropna=False)[price_col].first()
+            .unstack(side_col)
+            .reindex(columns=["over", "under"])
+            .rename(columns={"over": "odds_over", "under": "odds_under"})
+            .reset_index())
+    wide.columns.name = None
+    wide["odds_over"] = wide["odds_over"].astype("Int64")
+    wide["odds_under"] = wide["odds_under"].astype("Int64")
+    wide["no_vig_over"], wide["no_vig_under"] = no_vig(wide["odds_over"], wide["odds_under"])
+    return wide[out_cols]
@@ -0,0 +1,123 @@
+# -------------------------------------------------
+# scripts/player_index.py
+# -------------------------------------------------
+# Hot Shot Props — Player Name Resolver
+# Builds one in-memory index over nba_api's static player list
+# per process: exact normalized-name lookup, accent/suffix folding
+# ("Jokic" -> "Nikola Jokić", "Jr."), last-name shortcuts and a
+# prebuilt fuzzy index for sportsbook labels.
+# -------------------------------------------------
+
+import re
+import difflib
+import threading
+import unicodedata
+from functools import lru_cache
+
+from nba_api.stats.static import players
+
+NAME_SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+# Trailing words sportsbooks glue onto selection labels
+LABEL_NOISE = {"over", "under", "o", "u"}
+FUZZY_CUTOFF = 0.85
+
+
+def normalize_name(name: str):
+    """Lowercase, strip accents/punctuation and generational suffixes."""
+    if not name:
+        return ""
+    folded = unicodedata.normalize("NFKD", str(name))
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch)).lower()
+    tokens = re.sub(r"[^a-z0-9 ]+", " ", folded.replace("'", "").replace(".", "")).split()
+    while tokens and tokens[-1] in LABEL_NOISE:
+        tokens.pop()
+    tokens = [t for t in tokens if t not in NAME_SUFFIXES]
+    return " ".join(tokens)
+
+
+class PlayerIndex:
+    """Name -> player ID lookups over a static player list; O(1) for exact hits."""
+
+    def __init__(self, player_list):
+        self.by_id = {}
+        self.exact = {}
+        self.by_last = {}
+        self._fuzzy_buckets = {}
+        self._memo = {}
+        self._lock = threading.Lock()
+
+        # Active players first so they win name collisions with retirees
+        for p in sorted(player_list, key=lambda p: not p.get("is_active", False)):
+            pid = p["id"]
+            self.by_id[pid] = p
+            key = normalize_name(p["full_name"])
+            if not key:
+                continue
+            self.exact.setdefault(key, pid)
+            last = key.split()[-1]
+            self.by_last.setdefault(last, []).append(pid)
+            # Fuzzy candidates are bucketed by last-name prefix so a lookup
+            # compares against a handful of names, not the whole league;
+            # like the shortcuts, only active players are fuzzy targets
+            if p.get("is_active", False):
+                self._fuzzy_buckets.setdefault(last[:2], []).append(key)
+
+    def _resolve_uncached(self, key: str):
+        pid = self.exact.get(key)
+        if pid is not None:
+            return pid
+
+        tokens = key.split()
+        last = tokens[-1]
+        # Shortcuts only pick active players: a rookie missing from the
+        # static list must not resolve to a retiree who shares the name
+        # (retirees still resolve by exact name)
+        candidates = [c for c in self.by_last.get(last, []) if self.by_id[c].get("is_active", False)]
+        if len(tokens) == 1 and len(candidates) == 1:
+            return candidates[0]
+        if len(tokens) > 1 and candidates:
+            # "L James" / "Lebron James" style: match on first initial
+            initial = tokens[0][0]
+            hits = [c for c in candidates
+                    if normalize_name(self.by_id[c]["full_name"]).startswith(initial)]
+            if len(hits) == 1:
+                return hits[0]
+
+        bucket = self._fuzzy_buckets.get(last[:2], [])
+        close = difflib.get_close_matches(key, bucket, n=1, cutoff=FUZZY_CUTOFF)
+        return self.exact[close[0]] if close else None
+
+    def resolve(self, name: str):
+        """Return the nba_api player ID for a name or sportsbook label, or None."""
+        key = normalize_name(name)
+        if not key:
+            return None
+        with self._lock:
+            if key in self._memo:
+                return self._memo[key]
+        pid = self._resolve_uncached(key)
+        with self._lock:
+            self._memo[key] = pid
+        return pid
+
+    def resolve_many(self, names):
+        """Batch-resolve names -> {name: player_id or None}."""
+        return {name: self.resolve(name) for name in dict.fromkeys(names)}
+
+    def full_name(self, pid):
+        p = self.by_id.get(pid)
+        return p["full_name"] if p else None
+
+
+@lru_cache(maxsize=1)
+def get_player_index():
+    """Process-wide index, built once on first use."""
+    return PlayerIndex(players.get_players())
+
+
+def resolve_player_id(name: str):
+    return get_player_index().resolve(name)
+
+
+def resolve_players(names):
+    return get_player_index().resolve_many(names)
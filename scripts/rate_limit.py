@@ -0,0 +1,109 @@
+# -------------------------------------------------
+# scripts/rate_limit.py
+# -------------------------------------------------
+# Hot Shot Props — Rate Limiting
+# Thread-safe token buckets, one per upstream host, so
+# concurrent fetchers stay polite to sportsbook APIs.
+# -------------------------------------------------
+
+import os
+import time
+import threading
+from urllib.parse import urlparse
+
+DEFAULT_RATE_PER_SEC = float(os.getenv("HTTP_RATE_PER_HOST", "5"))
+DEFAULT_BURST = int(os.getenv("HTTP_BURST_PER_HOST", "5"))
+NBA_STATS_RATE_PER_SEC = float(os.getenv("NBA_STATS_RATE_PER_SEC", "0.7"))
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens/sec refill, up to `capacity` burst."""
+
+    def __init__(self, rate: float, capacity: int = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1, int(rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until `tokens` are available, then consume them."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# -------------------------------------------------
+# Per-host registry
+# -------------------------------------------------
+_BUCKETS = {}
+_BUCKETS_LOCK = threading.Lock()
+
+
+def _host(url_or_host: str):
+    return urlparse(url_or_host).netloc or url_or_host
+
+
+def host_bucket(url_or_host: str, rate: float = None, capacity: int = None):
+    """Return the shared bucket for a host, creating it on first use."""
+    host = _host(url_or_host)
+    with _BUCKETS_LOCK:
+        bucket = _BUCKETS.get(host)
+        if bucket is None:
+            bucket = TokenBucket(rate or DEFAULT_RATE_PER_SEC, capacity or DEFAULT_BURST)
+            _BUCKETS[host] = bucket
+        return bucket
+
+
+def configure_host(url_or_host: str, rate: float, capacity: int = None):
+    """Install (or replace) the bucket for a host with an explicit rate."""
+    host = _host(url_or_host)
+    with _BUCKETS_LOCK:
+        _BUCKETS[host] = TokenBucket(rate, capacity or max(1, int(rate)))
+        return _BUCKETS[host]
+
+
+def throttle(url: str):
+    """Wait for a slot on the URL's host bucket."""
+    host_bucket(url).acquire()
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """
+    Token bucket whose rate adapts AIMD-style: `penalize()` on a 429 or
+    timeout halves the rate, `reward()` on success creeps it back up.
+    """
+
+    def __init__(self, rate: float, capacity: int = None, min_rate: float = None,
+                 max_rate: float = None, increase: float = 0.05):
+        super().__init__(rate, capacity)
+        self.min_rate = float(min_rate if min_rate is not None else rate / 8)
+        self.max_rate = float(max_rate if max_rate is not None else rate * 2)
+        self.increase = float(increase)
+
+    def penalize(self):
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            # Drain the burst so the slowdown takes effect immediately
+            self._tokens = min(self._tokens, 0.0)
+
+    def reward(self):
+        with self._lock:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+
+# One stats.nba.com budget per process (game logs, team stats); nba_api
+# doesn't go through http_client, so it can't use the per-host buckets
+NBA_STATS_BUCKET = AdaptiveTokenBucket(NBA_STATS_RATE_PER_SEC, capacity=2, min_rate=0.1, max_rate=3.0)
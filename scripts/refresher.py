@@ -0,0 +1,229 @@
+# -------------------------------------------------
+# scripts/refresher.py
+# -------------------------------------------------
+# Hot Shot Props — Background Data Refresher
+# One daemon thread schedules every upstream source on its own
+# interval; due fetches run concurrently, each with a timeout, and
+# publish immutable snapshots to a shared, in-process store.
+# Streamlit sessions only read the latest
+# snapshot (and its age), so page latency no longer depends on
+# upstream latency and each source is fetched once per interval
+# no matter how many people have the dashboard open. Fallback books
+# are fetched once at start-up, then only polled while the primary
+# (FanDuel) snapshot is unusable.
+# -------------------------------------------------
+
+import os
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from scripts.fetch_fanduel import fetch_fanduel_props
+from scripts.fetch_games import fetch_games_today
+from scripts.fetch_oddsapi import fetch_oddsapi_data
+from scripts.fetch_prizepicks import fetch_prizepicks_data
+from scripts.odds_aggregator import SOURCE_PRIORITY, props_usable
+
+ODDS_REFRESH_SECONDS = int(os.getenv("ODDS_REFRESH_SECONDS", "60"))
+GAMES_REFRESH_SECONDS = int(os.getenv("GAMES_REFRESH_SECONDS", "600"))
+# The Odds API bills per request, so its fallback polls less often
+ODDSAPI_REFRESH_SECONDS = int(os.getenv("ODDSAPI_REFRESH_SECONDS", "300"))
+PRIZEPICKS_REFRESH_SECONDS = int(os.getenv("PRIZEPICKS_REFRESH_SECONDS", "120"))
+
+SOURCE_TIMEOUT_SECONDS = float(os.getenv("SOURCE_TIMEOUT_SECONDS", "20"))
+# FanDuel fans out one request per event
+FANDUEL_TIMEOUT_SECONDS = float(os.getenv("FANDUEL_TIMEOUT_SECONDS", "45"))
+
+# Published once and never mutated: every session reads the same frame,
+# so readers copy before editing
+Snapshot = namedtuple("Snapshot", ["source", "data", "fetched_at", "duration_s", "error"])
+
+
+# -------------------------------------------------
+# Shared snapshot store
+# -------------------------------------------------
+class SnapshotStore:
+    """Latest Snapshot per source; publish swaps the reference under a lock."""
+
+    def __init__(self):
+        self._snapshots = {}
+        self._version = 0
+        self._lock = threading.Lock()
+        self._published = threading.Condition(self._lock)
+
+    def publish(self, snapshot: Snapshot):
+        with self._lock:
+            self._snapshots[snapshot.source] = snapshot
+            self._version += 1
+            self._published.notify_all()
+
+    def get(self, source: str):
+        with self._lock:
+            return self._snapshots.get(source)
+
+    def wait_for(self, source: str, timeout: float = None):
+        """Block until `source` has a snapshot (first start-up only); None on timeout."""
+        with self._lock:
+            self._published.wait_for(lambda: source in self._snapshots, timeout=timeout)
+            return self._snapshots.get(source)
+
+    def age(self, source: str):
+        """Seconds since the source's snapshot was fetched, or None."""
+        snap = self.get(source)
+        return None if snap is None else (datetime.now() - snap.fetched_at).total_seconds()
+
+    @property
+    def version(self):
+        """Bumped on every publish."""
+        with self._lock:
+            return self._version
+
+    def wait_for_update(self, since: int, timeout: float = None):
+        """Block until something is published after version `since`; returns the new version."""
+        with self._lock:
+            self._published.wait_for(lambda: self._version > since, timeout=timeout)
+            return self._version
+
+
+# -------------------------------------------------
+# Refresh worker
+# -------------------------------------------------
+class BackgroundRefresher:
+    """
+    Polls `sources` ({name: (fetch_fn, interval_s[, timeout_s[, needed]])})
+    from a daemon scheduler thread. `needed(store) -> bool` gates a source:
+    it is always fetched once, then only while `needed` says so (checked
+    on every publish, so it starts as soon as the gate opens). Due
+    sources are fetched concurrently on a small pool, so a cold start
+    costs the slowest source, not the sum.
+    A fetch that raises, or is still running after its timeout, keeps
+    the previous data and records the error on a re-published snapshot
+    (an empty one if there is no previous data yet, so waiting readers
+    are released); a late result is still published when it lands.
+    """
+
+    def __init__(self, sources: dict, store: SnapshotStore = None):
+        self.sources = {name: self._spec(spec) for name, spec in sources.items()}
+        self.store = store or SnapshotStore()
+        self._due = {name: 0.0 for name in self.sources}
+        self._inflight = {}  # name -> [started (perf_counter), deadline (monotonic), timed_out]
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(self.sources)),
+                                        thread_name_prefix="source-fetch")
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _spec(spec):
+        fetch, interval, *rest = spec
+        timeout = rest[0] if rest and rest[0] is not None else SOURCE_TIMEOUT_SECONDS
+        needed = rest[1] if len(rest) > 1 else None
+        return fetch, interval, timeout, needed
+
+    def _parked(self, name: str):
+        """Due but gated off: fetched before and its `needed` check says not now."""
+        needed = self.sources[name][3]
+        return needed is not None and self.store.get(name) is not None and not needed(self.store)
+
+    def _publish_failure(self, name: str, error: str, duration: float):
+        previous = self.store.get(name)
+        if previous is not None:
+            # Keep serving the last good frame, but surface the failure
+            snap = previous._replace(error=error)
+        else:
+            snap = Snapshot(name, pd.DataFrame(), datetime.now(), duration, error)
+        self.store.publish(snap)
+        print(f"⚠️ Refresh {name} failed after {duration:.2f}s — {error}")
+
+    def _on_done(self, name: str, future):
+        with self._lock:
+            started = self._inflight.pop(name)[0]
+        duration = time.perf_counter() - started
+        try:
+            data = future.result()
+        except Exception as e:
+            self._publish_failure(name, str(e), duration)
+        else:
+            data = pd.DataFrame() if data is None else data
+            self.store.publish(Snapshot(name, data.copy(), datetime.now(), duration, None))
+            print(f"🔄 Refreshed {name} in {duration:.2f}s — {len(data)} rows")
+        self._wake.set()
+
+    def _check_timeouts(self, now: float):
+        late = []
+        with self._lock:
+            for name, state in self._inflight.items():
+                if not state[2] and now >= state[1]:
+                    state[2] = True
+                    late.append((name, time.perf_counter() - state[0]))
+        for name, duration in late:
+            self._publish_failure(name, f"timed out after {self.sources[name][2]}s", duration)
+
+    def _run(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            parked = {name for name, at in list(self._due.items())
+                      if at <= now and self._parked(name)}
+            with self._lock:
+                # A source still in flight is not resubmitted until it returns
+                due = [name for name, at in self._due.items()
+                       if at <= now and name not in self._inflight and name not in parked]
+                for name in due:
+                    fetch, interval, timeout, _ = self.sources[name]
+                    self._due[name] = now + interval
+                    self._inflight[name] = [time.perf_counter(), now + timeout, False]
+            for name in due:
+                future = self._pool.submit(self.sources[name][0])
+                future.add_done_callback(lambda f, name=name: self._on_done(name, f))
+            self._check_timeouts(time.monotonic())
+
+            with self._lock:
+                # Parked sources stay due and wait for the next publish to wake us
+                deadlines = [at for name, at in self._due.items() if name not in parked]
+                deadlines += [s[1] for s in self._inflight.values() if not s[2]]
+            wait = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            self._wake.wait(timeout=wait)
+            self._wake.clear()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="data-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def refresh_now(self, *sources):
+        """Make `sources` (default: all) due immediately without blocking the caller."""
+        with self._lock:
+            for name in sources or self.sources:
+                if name in self._due:
+                    self._due[name] = 0.0
+        self._wake.set()
+
+
+def primary_unusable(store: SnapshotStore):
+    """True while the top-priority props snapshot is missing, failed, empty or stale."""
+    return not props_usable(store.get(SOURCE_PRIORITY[0]))
+
+
+def default_sources():
+    # Fallback books start with the primary so they are warm if it fails,
+    # then go quiet until it does
+    return {
+        "odds": (fetch_fanduel_props, ODDS_REFRESH_SECONDS, FANDUEL_TIMEOUT_SECONDS),
+        "games": (fetch_games_today, GAMES_REFRESH_SECONDS),
+        "oddsapi": (fetch_oddsapi_data, ODDSAPI_REFRESH_SECONDS, None, primary_unusable),
+        "prizepicks": (fetch_prizepicks_data, PRIZEPICKS_REFRESH_SECONDS, None, primary_unusable),
+    }
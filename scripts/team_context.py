@@ -0,0 +1,139 @@
+# -------------------------------------------------
+# scripts/team_context.py
+# -------------------------------------------------
+# Hot Shot Props — Team Context Provider
+# Opponent defensive ranks cached on disk with a TTL (one
+# LeagueDashTeamStats call per day at most) plus immutable
+# "as-of" snapshots for past dates, fetched once and then
+# served from disk.
+# -------------------------------------------------
+
+import os
+import time
+import threading
+from datetime import date, timedelta
+
+import pandas as pd
+from nba_api.stats.endpoints import leaguedashteamstats
+
+from scripts.rate_limit import NBA_STATS_BUCKET
+from scripts.team_index import get_team_table
+
+TEAM_CONTEXT_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "team_context")
+os.makedirs(TEAM_CONTEXT_DIR, exist_ok=True)
+
+TEAM_CONTEXT_TTL_SECONDS = int(os.getenv("TEAM_CONTEXT_TTL_SECONDS", "86400"))
+
+ALLOWED_COLS = ["PTS_ALLOWED", "REB_ALLOWED", "AST_ALLOWED"]
+RANK_COLS = [f"{col}_RANK" for col in ALLOWED_COLS]
+
+# (season, as_of or None) -> (loaded_at, frame). _LOCK only guards the
+# dicts; the disk read / network fetch for a key runs under that key's
+# own lock, so callers wanting other dates (or a memo hit) never wait.
+_MEMO = {}
+_KEY_LOCKS = {}
+_LOCK = threading.Lock()
+
+
+def _snapshot_path(season: str, as_of):
+    tag = as_of.isoformat() if as_of else "current"
+    return os.path.join(TEAM_CONTEXT_DIR, f"defense_{season}_{tag}.parquet")
+
+
+def _fetch_defense(season: str, as_of=None):
+    """
+    One LeagueDashTeamStats call -> per-game opponent stats and ranks,
+    indexed by TEAM_ABBREVIATION. With `as_of`, only games before that
+    date are counted.
+    """
+    kwargs = {}
+    if as_of is not None:
+        kwargs["date_to_nullable"] = (as_of - timedelta(days=1)).strftime("%m/%d/%Y")
+    # Same stats.nba.com budget as the game-log fetches
+    NBA_STATS_BUCKET.acquire()
+    try:
+        team_stats = leaguedashteamstats.LeagueDashTeamStats(
+            season=season,
+            measure_type_detailed_defense="Opponent",
+            per_mode_detailed="PerGame",
+            timeout=30,
+            **kwargs,
+        ).get_data_frames()[0]
+    except Exception:
+        NBA_STATS_BUCKET.penalize()
+        raise
+    NBA_STATS_BUCKET.reward()
+    team_stats = team_stats[["TEAM_ID", "TEAM_NAME", "GP", "OPP_PTS", "OPP_REB", "OPP_AST"]]
+    team_stats = team_stats.rename(columns={"OPP_PTS": "PTS_ALLOWED", "OPP_REB": "REB_ALLOWED",
+                                            "OPP_AST": "AST_ALLOWED"})
+    # Lower allowed => tougher defense
+    for col in ALLOWED_COLS:
+        team_stats[f"{col}_RANK"] = team_stats[col].rank(ascending=True)
+    abbr_by_id = get_team_table().reset_index().set_index("TEAM_ID")["TEAM_ABBREVIATION"]
+    team_stats["TEAM_ABBREVIATION"] = team_stats["TEAM_ID"].map(abbr_by_id)
+    return team_stats.dropna(subset=["TEAM_ABBREVIATION"]).set_index("TEAM_ABBREVIATION")
+
+
+def _memo_get(key, as_of, ttl: int):
+    with _LOCK:
+        hit = _MEMO.get(key)
+    if hit and (as_of is not None or time.time() - hit[0] < ttl):
+        return hit[1]
+    return None
+
+
+def _memo_put(key, frame: pd.DataFrame, loaded_at: float = None):
+    with _LOCK:
+        _MEMO[key] = (time.time() if loaded_at is None else loaded_at, frame)
+    return frame
+
+
+def get_team_defense(season: str = "2024-25", as_of=None, ttl: int = None):
+    """
+    Team defensive ranks indexed by TEAM_ABBREVIATION.
+
+    Without `as_of` the current snapshot is reused until it is older than
+    `ttl` seconds (TEAM_CONTEXT_TTL_SECONDS by default); if the refresh
+    fails the stale snapshot is served. Past `as_of` dates are frozen once
+    fetched since those numbers never change.
+    """
+    ttl = TEAM_CONTEXT_TTL_SECONDS if ttl is None else ttl
+    if as_of is not None:
+        as_of = pd.Timestamp(as_of).date()
+        if as_of >= date.today():
+            as_of = None
+    key = (season, as_of)
+    path = _snapshot_path(season, as_of)
+
+    frame = _memo_get(key, as_of, ttl)
+    if frame is not None:
+        return frame
+    with _LOCK:
+        key_lock = _KEY_LOCKS.setdefault(key, threading.Lock())
+
+    with key_lock:
+        # Another caller may have loaded it while we waited
+        frame = _memo_get(key, as_of, ttl)
+        if frame is not None:
+            return frame
+
+        if os.path.exists(path) and (as_of is not None or time.time() - os.path.getmtime(path) < ttl):
+            frame = pd.read_parquet(path)
+            return _memo_put(key, frame, os.path.getmtime(path))
+
+        try:
+            frame = _fetch_defense(season, as_of)
+            tmp = f"{path}.tmp"
+            frame.to_parquet(tmp)
+            os.replace(tmp, path)
+            return _memo_put(key, frame)
+        except Exception as e:
+            if os.path.exists(path):
+                print(f"⚠️ Team defense refresh failed ({e}); serving stale snapshot")
+                return _memo_put(key, pd.read_parquet(path))
+            raise
+
+
+def clear_team_context_memo():
+    with _LOCK:
+        _MEMO.clear()
@@ -0,0 +1,86 @@
+# -------------------------------------------------
+# scripts/team_index.py
+# -------------------------------------------------
+# Hot Shot Props — Team Dimension Table
+# One precomputed table keyed by NBA abbreviation with team ID,
+# full name, BallDontLie name and sportsbook aliases, so every
+# source can be joined on the same three-letter key.
+# -------------------------------------------------
+
+import re
+from functools import lru_cache
+
+import pandas as pd
+from nba_api.stats.static import teams
+
+# BallDontLie names that differ from nba_api's full_name
+BDL_NAME_OVERRIDES = {
+    "LAC": "LA Clippers",
+}
+
+# Extra labels seen on sportsbooks / in older MATCHUP strings
+EXTRA_ALIASES = {
+    "BKN": ["BRK", "NJN", "New Jersey Nets"],
+    "CHA": ["CHO", "CHH", "Charlotte Bobcats"],
+    "GSW": ["GS", "Golden State"],
+    "LAC": ["LA Clippers"],
+    "LAL": ["LA Lakers"],
+    "NOP": ["NO", "NOH", "NOK", "New Orleans Hornets"],
+    "NYK": ["NY", "New York"],
+    "OKC": ["SEA", "Seattle SuperSonics"],
+    "PHX": ["PHO"],
+    "SAS": ["SA", "San Antonio"],
+    "UTA": ["UTAH"],
+    "WAS": ["WSH"],
+}
+
+
+def _norm(label: str):
+    return re.sub(r"[^a-z0-9]+", " ", str(label).lower()).strip()
+
+
+@lru_cache(maxsize=1)
+def get_team_table():
+    """
+    Team dimension indexed by TEAM_ABBREVIATION with TEAM_ID, TEAM_NAME,
+    NICKNAME, CITY, BDL_NAME and ALIASES (list of alternate labels).
+    """
+    rows = []
+    for t in teams.get_teams():
+        abbr = t["abbreviation"]
+        bdl_name = BDL_NAME_OVERRIDES.get(abbr, t["full_name"])
+        aliases = {abbr, t["full_name"], t["nickname"], bdl_name, *EXTRA_ALIASES.get(abbr, [])}
+        rows.append({
+            "TEAM_ABBREVIATION": abbr,
+            "TEAM_ID": t["id"],
+            "TEAM_NAME": t["full_name"],
+            "NICKNAME": t["nickname"],
+            "CITY": t["city"],
+            "BDL_NAME": bdl_name,
+            "ALIASES": sorted(aliases),
+        })
+    return pd.DataFrame(rows).set_index("TEAM_ABBREVIATION").sort_index()
+
+
+@lru_cache(maxsize=1)
+def _alias_map():
+    table = get_team_table()
+    lookup = {}
+    for abbr, aliases in table["ALIASES"].items():
+        for alias in aliases:
+            lookup[_norm(alias)] = abbr
+    return lookup
+
+
+def team_abbreviation(label):
+    """Map any team label (abbr, full name, nickname, BDL/sportsbook name) -> abbreviation."""
+    if label is None or (isinstance(label, float) and pd.isna(label)):
+        return None
+    return _alias_map().get(_norm(label))
+
+
+def to_abbreviations(labels: pd.Series):
+    """Vectorized `team_abbreviation` over a Series (one dict lookup per unique label)."""
+    uniques = pd.unique(labels.dropna())
+    mapping = {label: team_abbreviation(label) for label in uniques}
+    return labels.map(mapping)